@@ -1,161 +1,1308 @@
 import heapq
+from array import array
 from collections import deque
+from functools import wraps
+from time import perf_counter_ns
+import numpy as np
+from grid_graph import OPEN, as_grid_graph
+from priority_queues import make_queue
 
 DIRECTIONS = [(-1,0), (1,0), (0,-1), (0,1)]
 
-def reconstruct_path(prev, start, end):
+# Step events
+# -----------
+# By default every *_stepwise generator yields delta events describing only what
+# changed since the previous event:
+#     {"current": cell, "settled": cell, "pushed": [cells], "removed": [cells]}
+# "pushed" holds the cells that entered the frontier since the last event and
+# "removed" the cells that left it. The final event has "current"/"settled" set
+# to None, drains the remaining frontier through "removed" and carries "path"
+# and the run's counters:
+#     "expanded": cells settled
+#     "relaxations": edges examined into open cells
+#     "pushes": entries added to the frontier container (heap, queue, stack)
+#     "stale_pops": popped entries skipped because their cell was already settled
+#     "peak_frontier": largest size of the frontier container
+#     "algo_ns": nanoseconds spent inside the generator, excluding the caller
+# Passing snapshot=True restores the old behaviour of yielding full copies of
+# the "visited" and "frontier" sets on every step.
+
+def _step_event(current, pushed, visited, frontier, snapshot):
+    if snapshot:
+        return {
+            "visited": visited.copy(),
+            "frontier": frontier.copy(),
+            "current": current,
+        }
+    return {
+        "current": current,
+        "settled": current,
+        "pushed": pushed,
+        "removed": [current],
+    }
+
+def _final_event(path, visited, frontier, snapshot, expanded=None, **report):
+    # Extra keyword arguments (e.g. peak_queue) are added to the run report
+    if expanded is None:
+        expanded = len(visited)
+    if snapshot:
+        return {
+            "visited": visited,
+            "frontier": set(),
+            "current": None,
+            "path": path,
+            "expanded": expanded,
+            **report,
+        }
+    return {
+        "current": None,
+        "settled": None,
+        "pushed": [],
+        "removed": list(frontier),
+        "path": path,
+        "expanded": expanded,
+        **report,
+    }
+
+def apply_step(step, visited, frontier):
+    """
+    Fold one step event into the caller's visited/frontier sets in place.
+    Accepts both delta events and snapshot (snapshot=True) events.
+    """
+    if "settled" in step:
+        # Pushes are applied before removals: the settled cell may have been
+        # pushed after the previous event.
+        frontier.update(step["pushed"])
+        frontier.difference_update(step["removed"])
+        if step["settled"] is not None:
+            visited.add(step["settled"])
+        # Wavefront events settle a whole BFS level at once
+        visited.update(step.get("wavefront", ()))
+    else:
+        visited.clear()
+        visited.update(step.get("visited", set()))
+        frontier.clear()
+        frontier.update(step.get("frontier", set()))
+
+def _timed_stepwise(stepwise):
+    # Adds "algo_ns" to the final event. Only time spent inside next() is
+    # counted, so whatever the caller does between steps (rendering) is not.
+    @wraps(stepwise)
+    def wrapper(*args, **kwargs):
+        return _time_steps(stepwise(*args, **kwargs))
+    return wrapper
+
+def _time_steps(steps):
+    total = 0
+    while True:
+        t0 = perf_counter_ns()
+        try:
+            step = next(steps)
+        except StopIteration:
+            return
+        total += perf_counter_ns() - t0
+        if "path" in step:
+            step["algo_ns"] = total
+        yield step
+
+# Scratch buffers
+# ---------------
+# Searches keep distances and parents in flat int32 buffers indexed like the
+# padded GridGraph, with -1 for "not reached" / "no parent". Finished runs hand
+# their buffers back, so repeated runs on the same grid size reuse them and
+# only pay a memcpy reset. Buffers are checked out per run, so generators that
+# run side by side never share one.
+
+_SCRATCH = {}
+_MINUS_ONES = {}
+
+def _take_buffers(n, count):
+    free = _SCRATCH.setdefault(n, [])
+    if n not in _MINUS_ONES:
+        _MINUS_ONES[n] = array('i', [-1]) * n
+    buffers = []
+    for _ in range(count):
+        if free:
+            buffer = free.pop()
+            buffer[:] = _MINUS_ONES[n]
+        else:
+            buffer = array('i', _MINUS_ONES[n])
+        buffers.append(buffer)
+    return buffers
+
+def _release_buffers(buffers):
+    for buffer in buffers:
+        _SCRATCH[len(buffer)].append(buffer)
+
+def _flat_path(prev, s, e, graph):
     path = []
-    cur = end
-    while cur and prev[cur[0]][cur[1]] is not None:
+    cur = e
+    while prev[cur] != -1:
         path.append(cur)
-        cur = prev[cur[0]][cur[1]]
-    if cur == start:
-        path.append(start)
-        path.reverse()
-        return path
-    return []
-
-def dijkstra_stepwise(start, end, rows, cols, grid):
-    dist = [[float('inf')] * cols for _ in range(rows)]
-    prev = [[None] * cols for _ in range(rows)]
-    dist[start[0]][start[1]] = 0
-    heap = [(0, start)]
+        cur = prev[cur]
+    if cur != s:
+        return []
+    path.append(s)
+    path.reverse()
+    return [graph.cell(i) for i in path]
+
+def reconstruct_path(prev, start, end, graph):
+    """Decode a flat parent buffer into the cells from start to end ([] if end was not reached)."""
+    return _flat_path(prev, graph.index(start), graph.index(end), graph)
+
+@_timed_stepwise
+def dijkstra_stepwise(start, end, rows, cols, grid, snapshot=False, queue="heapq"):
+    # The padded wall border of the GridGraph replaces explicit bounds checks
+    graph = as_grid_graph(grid)
+    open_ = graph.passable()
+    weights = graph.weights()
+    offsets = graph.offsets
+    cell = graph.cell
+    s, e = graph.index(start), graph.index(end)
+    buffers = dist, prev = _take_buffers(len(open_), 2)
+    try:
+        dist[s] = 0
+        pq = make_queue(queue)
+        pq.update(s, 0)
+        relaxations, pushes, stale_pops = 0, 1, 0
+        visited = set()
+        frontier = {start}
+        pushed = [start]
+        while pq:
+            d, u = pq.pop()
+            current = cell(u)
+            if current in visited:
+                stale_pops += 1
+                continue
+            visited.add(current)
+            frontier.discard(current)
+            yield _step_event(current, pushed, visited, frontier, snapshot)
+            pushed = []
+            if u == e:
+                break
+            for off in offsets:
+                v = u + off
+                if open_[v]:
+                    relaxations += 1
+                    nd = d + weights[v]
+                    if dist[v] < 0 or nd < dist[v]:
+                        dist[v] = nd
+                        prev[v] = u
+                        pq.update(v, nd)
+                        pushes += 1
+                        neighbour = cell(v)
+                        if neighbour not in frontier:
+                            frontier.add(neighbour)
+                            pushed.append(neighbour)
+        path = reconstruct_path(prev, start, end, graph)
+    finally:
+        _release_buffers(buffers)
+    yield _final_event(path, visited, frontier, snapshot, queue=queue, peak_queue=pq.peak,
+                       relaxations=relaxations, pushes=pushes, stale_pops=stale_pops, peak_frontier=pq.peak)
+
+@_timed_stepwise
+def bfs_stepwise(start, end, rows, cols, grid, snapshot=False):
+    graph = as_grid_graph(grid)
+    open_ = graph.passable()
+    offsets = graph.offsets
+    cell = graph.cell
+    s, e = graph.index(start), graph.index(end)
+    queue = deque([s])
+    buffers = prev, = _take_buffers(len(open_), 1)
+    try:
+        # A cell already in the frontier is not queued again: FIFO order
+        # settles it from its first push anyway, so there are no stale pops
+        # and the counters match solve_bfs
+        relaxations, pushes, peak_frontier = 0, 1, 1
+        visited = set()
+        frontier = {start}
+        pushed = [start]
+        while queue:
+            u = queue.popleft()
+            current = cell(u)
+            visited.add(current)
+            frontier.discard(current)
+            yield _step_event(current, pushed, visited, frontier, snapshot)
+            pushed = []
+            if u == e:
+                break
+            for off in offsets:
+                v = u + off
+                if not open_[v]:
+                    continue
+                relaxations += 1
+                neighbour = cell(v)
+                if neighbour not in visited and neighbour not in frontier:
+                    queue.append(v)
+                    pushes += 1
+                    prev[v] = u
+                    frontier.add(neighbour)
+                    pushed.append(neighbour)
+            peak_frontier = max(peak_frontier, len(queue))
+        path = reconstruct_path(prev, start, end, graph)
+    finally:
+        _release_buffers(buffers)
+    yield _final_event(path, visited, frontier, snapshot, relaxations=relaxations, pushes=pushes,
+                       stale_pops=0, peak_frontier=peak_frontier)
+
+@_timed_stepwise
+def dfs_stepwise(start, end, rows, cols, grid, snapshot=False):
+    graph = as_grid_graph(grid)
+    open_ = graph.passable()
+    offsets = graph.offsets
+    cell = graph.cell
+    s, e = graph.index(start), graph.index(end)
+    stack = [s]
+    buffers = prev, = _take_buffers(len(open_), 1)
+    try:
+        relaxations, pushes, stale_pops, peak_frontier = 0, 1, 0, 1
+        visited = set()
+        frontier = {start}
+        pushed = [start]
+        while stack:
+            u = stack.pop()
+            current = cell(u)
+            if current in visited:
+                stale_pops += 1
+                continue
+            visited.add(current)
+            frontier.discard(current)
+            yield _step_event(current, pushed, visited, frontier, snapshot)
+            pushed = []
+            if u == e:
+                break
+            for off in offsets:
+                v = u + off
+                if not open_[v]:
+                    continue
+                relaxations += 1
+                neighbour = cell(v)
+                if neighbour not in visited:
+                    stack.append(v)
+                    pushes += 1
+                    # The first cell to push v stays its parent
+                    if prev[v] == -1:
+                        prev[v] = u
+                    if neighbour not in frontier:
+                        frontier.add(neighbour)
+                        pushed.append(neighbour)
+            peak_frontier = max(peak_frontier, len(stack))
+        path = reconstruct_path(prev, start, end, graph)
+    finally:
+        _release_buffers(buffers)
+    yield _final_event(path, visited, frontier, snapshot, relaxations=relaxations, pushes=pushes,
+                       stale_pops=stale_pops, peak_frontier=peak_frontier)
+
+@_timed_stepwise
+def astar_stepwise(start, end, rows, cols, grid, snapshot=False, queue="heapq"):
+    graph = as_grid_graph(grid)
+    open_ = graph.passable()
+    weights = graph.weights()
+    offsets = graph.offsets
+    stride = graph.stride
+    cell = graph.cell
+    s, e = graph.index(start), graph.index(end)
+    # Heuristic in padded coordinates
+    er, ec = end[0] + 1, end[1] + 1
+    buffers = g_score, prev = _take_buffers(len(open_), 2)
+    try:
+        g_score[s] = 0
+        pq = make_queue(queue)
+        pq.update(s, abs(start[0] - end[0]) + abs(start[1] - end[1]))
+        relaxations, pushes, stale_pops = 0, 1, 0
+        visited = set()
+        frontier = {start}
+        pushed = [start]
+        while pq:
+            _, u = pq.pop()
+            current = cell(u)
+            if current in visited:
+                stale_pops += 1
+                continue
+            visited.add(current)
+            frontier.discard(current)
+            yield _step_event(current, pushed, visited, frontier, snapshot)
+            pushed = []
+            if u == e:
+                break
+            g = g_score[u]
+            for off in offsets:
+                v = u + off
+                if open_[v]:
+                    relaxations += 1
+                    tentative_g = g + weights[v]
+                    if g_score[v] < 0 or tentative_g < g_score[v]:
+                        g_score[v] = tentative_g
+                        prev[v] = u
+                        r, c = divmod(v, stride)
+                        pq.update(v, tentative_g + abs(r - er) + abs(c - ec))
+                        pushes += 1
+                        neighbour = cell(v)
+                        if neighbour not in frontier:
+                            frontier.add(neighbour)
+                            pushed.append(neighbour)
+        path = reconstruct_path(prev, start, end, graph)
+    finally:
+        _release_buffers(buffers)
+    yield _final_event(path, visited, frontier, snapshot, queue=queue, peak_queue=pq.peak,
+                       relaxations=relaxations, pushes=pushes, stale_pops=stale_pops, peak_frontier=pq.peak)
+
+# Dial's algorithm
+# ----------------
+# Dijkstra for small integer terrain costs. Pending cells sit in a circular
+# array of max_cost + 1 buckets indexed by distance modulo the bucket count:
+# every pending distance lies within max_cost of the current one, so buckets
+# never mix distances. Each pop is O(1) amortised, no heap is needed and the
+# whole run is O(V + D) for a goal distance D.
+
+@_timed_stepwise
+def dial_stepwise(start, end, rows, cols, grid, snapshot=False):
+    graph = as_grid_graph(grid)
+    open_ = graph.passable()
+    weights = graph.weights()
+    offsets = graph.offsets
+    cell = graph.cell
+    s, e = graph.index(start), graph.index(end)
+    nbuckets = graph.max_cost() + 1
+    buckets = [[] for _ in range(nbuckets)]
+    buffers = dist, prev = _take_buffers(len(open_), 2)
+    try:
+        dist[s] = 0
+        buckets[0].append(s)
+        pending = 1
+        d = 0
+        relaxations, pushes, stale_pops, peak_frontier = 0, 1, 0, 1
+        visited = set()
+        frontier = {start}
+        pushed = [start]
+        while pending:
+            bucket = buckets[d % nbuckets]
+            if not bucket:
+                d += 1
+                continue
+            u = bucket.pop()
+            pending -= 1
+            current = cell(u)
+            # Stale entries were queued before their distance dropped
+            if current in visited or dist[u] != d:
+                stale_pops += 1
+                continue
+            visited.add(current)
+            frontier.discard(current)
+            yield _step_event(current, pushed, visited, frontier, snapshot)
+            pushed = []
+            if u == e:
+                break
+            for off in offsets:
+                v = u + off
+                if not open_[v]:
+                    continue
+                relaxations += 1
+                nd = d + weights[v]
+                if dist[v] < 0 or nd < dist[v]:
+                    dist[v] = nd
+                    prev[v] = u
+                    buckets[nd % nbuckets].append(v)
+                    pending += 1
+                    pushes += 1
+                    neighbour = cell(v)
+                    if neighbour not in frontier:
+                        frontier.add(neighbour)
+                        pushed.append(neighbour)
+            peak_frontier = max(peak_frontier, pending)
+        path = reconstruct_path(prev, start, end, graph)
+    finally:
+        _release_buffers(buffers)
+    yield _final_event(path, visited, frontier, snapshot, relaxations=relaxations, pushes=pushes,
+                       stale_pops=stale_pops, peak_frontier=peak_frontier)
+
+def _join_paths(prev_forward, prev_backward, meet):
+    path = []
+    cur = meet
+    while cur is not None:
+        path.append(cur)
+        cur = prev_forward[cur]
+    path.reverse()
+    cur = prev_backward[meet]
+    while cur is not None:
+        path.append(cur)
+        cur = prev_backward[cur]
+    return path
+
+def _bidirectional_stepwise(start, end, grid, snapshot, kind):
+    # Side 0 searches forward from start, side 1 backward from end. The side
+    # with the smaller queue expands next. best is the length of the shortest
+    # start-end path seen so far, through the cell meet.
+    graph = as_grid_graph(grid)
+    open_ = graph.passable()
+    weights = graph.weights()
+    stride = graph.stride
+    targets = (end, start)
+
+    def key(side, d, cell):
+        if kind != "astar":
+            return d
+        target = targets[side]
+        return d + abs(cell[0] - target[0]) + abs(cell[1] - target[1])
+
+    dist = ({start: 0}, {end: 0})
+    prev = ({start: None}, {end: None})
+    done = (set(), set())
+    if kind == "bfs":
+        queues = (deque([(0, start)]), deque([(0, end)]))
+    else:
+        queues = ([(key(0, 0, start), start)], [(key(1, 0, end), end)])
+    best, meet = (0, start) if start == end else (float('inf'), None)
     visited = set()
-    frontier = {start}
-    while heap:
-        d, (r, c) = heapq.heappop(heap)
-        if (r, c) in visited:
+    frontier = {start, end}
+    pushed = list(frontier)
+    expanded = 0
+    relaxations, pushes, stale_pops, peak_frontier = 0, 2, 0, 2
+    while queues[0] and queues[1]:
+        # Stopping rule: no unexplored path can beat best any more. For BFS and
+        # Dijkstra that is when the two smallest distances sum to at least best;
+        # with consistent heuristics it is when either smallest f reaches best.
+        top0, top1 = queues[0][0][0], queues[1][0][0]
+        if kind == "astar":
+            if max(top0, top1) >= best:
+                break
+        elif top0 + top1 >= best:
+            break
+        side = 0 if len(queues[0]) <= len(queues[1]) else 1
+        queue = queues[side]
+        if kind == "bfs":
+            _, (r, c) = queue.popleft()
+        else:
+            _, (r, c) = heapq.heappop(queue)
+        if (r, c) in done[side]:
+            stale_pops += 1
             continue
+        done[side].add((r, c))
+        expanded += 1
         visited.add((r, c))
         frontier.discard((r, c))
-        yield {
-            "visited": visited.copy(),
-            "frontier": frontier.copy(),
-            "current": (r, c),
-        }
-        if (r, c) == end:
-            break
+        yield _step_event((r, c), pushed, visited, frontier, snapshot)
+        pushed = []
+        own, other = dist[side], dist[1 - side]
+        d = own[(r, c)]
+        # BFS counts hops. Otherwise the forward side pays for the cell it
+        # enters and the backward side for the cell it leaves.
+        leave_cost = weights[(r + 1) * stride + c + 1]
         for dr, dc in DIRECTIONS:
             nr, nc = r + dr, c + dc
-            if 0 <= nr < rows and 0 <= nc < cols and grid[nr][nc] == 0:
-                if dist[nr][nc] > d + 1:
-                    dist[nr][nc] = d + 1
-                    prev[nr][nc] = (r, c)
-                    heapq.heappush(heap, (dist[nr][nc], (nr, nc)))
+            i = (nr + 1) * stride + nc + 1
+            if not open_[i]:
+                continue
+            relaxations += 1
+            if kind == "bfs":
+                nd = d + 1
+            elif side == 0:
+                nd = d + weights[i]
+            else:
+                nd = d + leave_cost
+            if nd < own.get((nr, nc), float('inf')):
+                own[(nr, nc)] = nd
+                prev[side][(nr, nc)] = (r, c)
+                if kind == "bfs":
+                    queue.append((nd, (nr, nc)))
+                else:
+                    heapq.heappush(queue, (key(side, nd, (nr, nc)), (nr, nc)))
+                pushes += 1
+                if (nr, nc) not in frontier:
                     frontier.add((nr, nc))
-    path = reconstruct_path(prev, start, end)
-    yield {
-        "visited": visited,
-        "frontier": set(),
-        "current": None,
-        "path": path,
-    }
+                    pushed.append((nr, nc))
+                if (nr, nc) in other and nd + other[(nr, nc)] < best:
+                    best = nd + other[(nr, nc)]
+                    meet = (nr, nc)
+        peak_frontier = max(peak_frontier, len(queues[0]) + len(queues[1]))
+    path = _join_paths(prev[0], prev[1], meet) if meet is not None else []
+    yield _final_event(path, visited, frontier, snapshot, expanded, relaxations=relaxations, pushes=pushes,
+                       stale_pops=stale_pops, peak_frontier=peak_frontier)
+
+@_timed_stepwise
+def bidirectional_bfs_stepwise(start, end, rows, cols, grid, snapshot=False):
+    return _bidirectional_stepwise(start, end, grid, snapshot, "bfs")
+
+@_timed_stepwise
+def bidirectional_dijkstra_stepwise(start, end, rows, cols, grid, snapshot=False):
+    return _bidirectional_stepwise(start, end, grid, snapshot, "dijkstra")
+
+@_timed_stepwise
+def bidirectional_astar_stepwise(start, end, rows, cols, grid, snapshot=False):
+    return _bidirectional_stepwise(start, end, grid, snapshot, "astar")
+
+# Jump Point Search
+# -----------------
+# With uniform move costs most shortest paths are symmetric variations of each
+# other. JPS scans straight lines from each expanded cell and only pushes the
+# "jump points" where a path might have to turn (a neighbour opens up next to
+# a wall) or the goal itself. This is the 4-connected variant: vertical scans
+# also stop where a horizontal scan from the same cell finds a jump point.
+# Both functions work on flat indices into the padded GridGraph. JPS is only
+# correct when every move costs the same, so weighted terrain raises ValueError.
+
+def _jps_jump(open_, v, d, stride, goal):
+    # Scan from v in direction d; return the first jump point or -1 at a wall
+    horizontal = d == 1 or d == -1
+    while True:
+        v += d
+        if not open_[v]:
+            return -1
+        if v == goal:
+            return v
+        if horizontal:
+            if (open_[v - stride] and not open_[v - stride - d]) or (open_[v + stride] and not open_[v + stride - d]):
+                return v
+        else:
+            if (open_[v - 1] and not open_[v - 1 - d]) or (open_[v + 1] and not open_[v + 1 - d]):
+                return v
+            if _jps_jump(open_, v, 1, stride, goal) != -1 or _jps_jump(open_, v, -1, stride, goal) != -1:
+                return v
+
+def _jps_directions(u, parent, stride):
+    # Pruned scan directions: no parent means all four, otherwise keep going
+    # straight and try both perpendicular turns
+    if parent == -1:
+        return (-stride, stride, -1, 1)
+    delta = u - parent
+    if -stride < delta < stride:
+        return (-stride, stride, 1 if delta > 0 else -1)
+    return (-1, 1, stride if delta > 0 else -stride)
+
+def _jps_path(prev, s, e, graph):
+    # Interpolate the straight segments between consecutive jump points
+    points = _flat_path(prev, s, e, graph)
+    if not points:
+        return []
+    path = [points[0]]
+    for r, c in points[1:]:
+        pr, pc = path[-1]
+        dr = (r > pr) - (r < pr)
+        dc = (c > pc) - (c < pc)
+        while (pr, pc) != (r, c):
+            pr, pc = pr + dr, pc + dc
+            path.append((pr, pc))
+    return path
 
-def bfs_stepwise(start, end, rows, cols, grid):
-    queue = deque([start])
-    prev = [[None] * cols for _ in range(rows)]
+def _uniform_graph(grid):
+    graph = as_grid_graph(grid)
+    if not graph.is_uniform():
+        raise ValueError("Jump Point Search needs uniform move costs; clear the terrain first")
+    return graph
+
+@_timed_stepwise
+def jps_stepwise(start, end, rows, cols, grid, snapshot=False):
+    # Validate eagerly so callers see the error before the first step
+    return _jps_stepwise(start, end, _uniform_graph(grid), snapshot)
+
+def _jps_stepwise(start, end, graph, snapshot):
+    open_ = graph.passable()
+    stride = graph.stride
+    s, e = graph.index(start), graph.index(end)
+    er, ec = divmod(e, stride)
+    g_score = {s: 0}
+    prev = {s: -1}
+    heap = [(abs(start[0] - end[0]) + abs(start[1] - end[1]), s)]
     visited = set()
     frontier = {start}
-    while queue:
-        r, c = queue.popleft()
-        if (r, c) in visited:
+    pushed = [start]
+    done = set()
+    relaxations, pushes, stale_pops, peak_frontier = 0, 1, 0, 1
+    while heap:
+        _, u = heapq.heappop(heap)
+        if u in done:
+            stale_pops += 1
             continue
-        visited.add((r, c))
-        frontier.discard((r, c))
-        yield {
-            "visited": visited.copy(),
-            "frontier": frontier.copy(),
-            "current": (r, c),
-        }
-        if (r, c) == end:
+        done.add(u)
+        cell = graph.cell(u)
+        visited.add(cell)
+        frontier.discard(cell)
+        yield _step_event(cell, pushed, visited, frontier, snapshot)
+        pushed = []
+        if u == e:
             break
+        ur, uc = divmod(u, stride)
+        for d in _jps_directions(u, prev[u], stride):
+            v = _jps_jump(open_, u, d, stride, e)
+            if v == -1 or v in done:
+                continue
+            # An edge here is a jump to the next jump point
+            relaxations += 1
+            vr, vc = divmod(v, stride)
+            tentative_g = g_score[u] + abs(vr - ur) + abs(vc - uc)
+            if tentative_g < g_score.get(v, float('inf')):
+                g_score[v] = tentative_g
+                prev[v] = u
+                heapq.heappush(heap, (tentative_g + abs(vr - er) + abs(vc - ec), v))
+                pushes += 1
+                jump_point = graph.cell(v)
+                if jump_point not in frontier:
+                    frontier.add(jump_point)
+                    pushed.append(jump_point)
+        peak_frontier = max(peak_frontier, len(heap))
+    path = _jps_path(prev, s, e, graph) if e in prev else []
+    yield _final_event(path, visited, frontier, snapshot, relaxations=relaxations, pushes=pushes,
+                       stale_pops=stale_pops, peak_frontier=peak_frontier)
+
+# Distance fields
+# ---------------
+# distance_field() runs a level-synchronous BFS from one source over the whole
+# grid with NumPy. Each wavefront is an array of flat indices into the padded
+# GridGraph; the next one is gathered with the four neighbour offsets at once
+# and masked by the still-unvisited open cells. Shifting full boolean masks
+# would cost O(rows * cols) per level, this costs O(wavefront) per level.
+
+def _wavefronts(graph, source):
+    # Yields (level, flat indices of the cells first reached at that level)
+    unvisited = (graph.padded == OPEN).ravel()
+    offsets = np.array(graph.offsets, dtype=np.intp)
+    slot = np.empty(unvisited.size, dtype=np.intp)
+    front = np.array([graph.index(source)], dtype=np.intp)
+    unvisited[front] = False
+    level = 0
+    while front.size:
+        yield level, front
+        level += 1
+        candidates = (front[:, None] + offsets).ravel()
+        candidates = candidates[unvisited[candidates]]
+        # Drop duplicates in O(k): keep the entry that wrote each slot last
+        order = np.arange(candidates.size)
+        slot[candidates] = order
+        front = candidates[slot[candidates] == order]
+        unvisited[front] = False
+
+def distance_field(grid, source):
+    """
+    BFS distance (in moves) from source to every cell as an int32 array of shape
+    (rows, cols); walls and unreachable cells hold -1.
+    """
+    graph = as_grid_graph(grid)
+    dist = np.full(graph.padded.size, -1, dtype=np.int32)
+    for level, front in _wavefronts(graph, source):
+        dist[front] = level
+    return dist.reshape(graph.padded.shape)[1:-1, 1:-1].copy()
+
+def path_from_field(field, end):
+    """Walk a distance_field() downhill from end; returns source..end or [] if unreachable."""
+    rows, cols = field.shape
+    r, c = end
+    d = int(field[r, c])
+    if d < 0:
+        return []
+    path = [(r, c)]
+    while d > 0:
         for dr, dc in DIRECTIONS:
             nr, nc = r + dr, c + dc
-            if 0 <= nr < rows and 0 <= nc < cols and grid[nr][nc] == 0 and (nr, nc) not in visited:
-                queue.append((nr, nc))
-                if prev[nr][nc] is None:
-                    prev[nr][nc] = (r, c)
-                frontier.add((nr, nc))
-    path = reconstruct_path(prev, start, end)
-    yield {
-        "visited": visited,
-        "frontier": set(),
-        "current": None,
-        "path": path,
-    }
+            if 0 <= nr < rows and 0 <= nc < cols and field[nr, nc] == d - 1:
+                r, c = nr, nc
+                break
+        path.append((r, c))
+        d -= 1
+    path.reverse()
+    return path
 
-def dfs_stepwise(start, end, rows, cols, grid):
-    stack = [start]
-    prev = [[None] * cols for _ in range(rows)]
+@_timed_stepwise
+def distance_field_stepwise(start, end, rows, cols, grid, snapshot=False):
+    # One event per BFS level: "wavefront" lists the cells at distance "level".
+    # The search never stops early; the final event carries the path to end.
+    # Every settled cell is pushed exactly once; its relaxations are its open
+    # neighbours, as in bfs_stepwise.
+    graph = as_grid_graph(grid)
+    passable = (graph.padded == OPEN).ravel()
+    offsets = np.array(graph.offsets, dtype=np.intp)
+    dist = np.full(graph.padded.size, -1, dtype=np.int32)
     visited = set()
-    frontier = {start}
+    relaxations, peak_frontier = 0, 0
+    for level, front in _wavefronts(graph, start):
+        dist[front] = level
+        relaxations += int(passable[(front[:, None] + offsets).ravel()].sum())
+        peak_frontier = max(peak_frontier, front.size)
+        r, c = np.divmod(front - graph.stride - 1, graph.stride)
+        cells = list(zip(r.tolist(), c.tolist()))
+        visited.update(cells)
+        if snapshot:
+            yield {"visited": visited.copy(), "frontier": set(), "current": None, "level": level, "wavefront": cells}
+        else:
+            yield {"current": None, "settled": None, "pushed": [], "removed": [], "level": level, "wavefront": cells}
+    field = dist.reshape(graph.padded.shape)[1:-1, 1:-1]
+    yield _final_event(path_from_field(field, end), visited, set(), snapshot, relaxations=relaxations,
+                       pushes=len(visited), stale_pops=0, peak_frontier=peak_frontier)
+
+# Incremental planning
+# --------------------
+# LPAStar is Lifelong Planning A*: it keeps g (distance found so far) and rhs
+# (one-step lookahead from the neighbours' g) for every cell across grid edits.
+# A cell is queued only while g != rhs, so after a wall toggle or terrain change
+# a replan re-expands just the cells whose distance from the start actually
+# changed instead of searching again from scratch.
+
+class LPAStar:
+    """
+    Lifelong Planning A* between two cells of a grid.
+    The planner keeps a reference to the GridGraph and rereads its walls and
+    costs on every replan; call cell_changed() for each edited cell first.
+    Params:
+        grid (GridGraph or list of list): Grid to plan on (a list of lists is copied,
+            so later edits to it are not seen).
+        start (tuple): Start cell (row, col).
+        end (tuple): End cell (row, col).
+    """
+
+    def __init__(self, grid, start, end):
+        graph = self.graph = as_grid_graph(grid)
+        self.start, self.end = start, end
+        self._s, self._e = graph.index(start), graph.index(end)
+        n = graph.padded.size
+        self.g = [float('inf')] * n
+        self.rhs = [float('inf')] * n
+        self.rhs[self._s] = 0
+        # Heap of (k1, k2, index) with lazy deletion; _queued holds the live key
+        self._heap = []
+        self._queued = {}
+        self._changed = [self._s]
+        self._touched = set()
+
+    def cell_changed(self, cell):
+        """Record that the wall or terrain cost of cell has changed."""
+        self._changed.append(self.graph.index(cell))
+
+    def _key(self, v):
+        m = min(self.g[v], self.rhs[v])
+        r, c = divmod(v, self.graph.stride)
+        return (m + abs(r - self._er) + abs(c - self._ec), m)
+
+    def _update_vertex(self, v):
+        g, rhs = self.g, self.rhs
+        if v != self._s:
+            if self._open[v]:
+                best = min((g[v + off] for off in self.graph.offsets if self._open[v + off]), default=float('inf'))
+                rhs[v] = best + self._weights[v]
+            else:
+                rhs[v] = float('inf')
+        self._relaxations += 1
+        if g[v] != rhs[v]:
+            key = self._key(v)
+            self._queued[v] = key
+            heapq.heappush(self._heap, (key[0], key[1], v))
+            self._pushes += 1
+            self._peak = max(self._peak, len(self._heap))
+            self._touched.add(v)
+        elif v in self._queued:
+            del self._queued[v]
+            self._touched.add(v)
+
+    def _top(self):
+        # Drop stale heap entries and return the smallest live key, if any
+        heap, queued = self._heap, self._queued
+        while heap and queued.get(heap[0][2]) != heap[0][:2]:
+            heapq.heappop(heap)
+            self._stale_pops += 1
+        return heap[0][:2] if heap else None
+
+    def _event(self, u, visited, snapshot):
+        cell = self.graph.cell
+        if snapshot:
+            frontier = {cell(v) for v in self._queued}
+            return {"visited": visited.copy(), "frontier": frontier, "current": cell(u)}
+        queued = self._queued
+        touched = self._touched
+        self._touched = set()
+        return {
+            "current": cell(u),
+            "settled": cell(u),
+            "pushed": [cell(v) for v in touched if v in queued],
+            "removed": [cell(v) for v in touched if v not in queued],
+        }
+
+    def path(self):
+        """Shortest path from start to end under the current g values ([] if unreachable)."""
+        g, s, e = self.g, self._s, self._e
+        if g[e] == float('inf'):
+            return []
+        offsets, open_ = self.graph.offsets, self._open
+        path = [e]
+        cur = e
+        while cur != s and len(path) < len(g):
+            cur = min((cur + off for off in offsets if open_[cur + off]), key=g.__getitem__)
+            path.append(cur)
+        path.reverse()
+        return [self.graph.cell(i) for i in path]
+
+    def steps(self, snapshot=False):
+        """
+        Repair the search after the recorded cell changes, yielding one step
+        event per expanded cell and a final event with the new path.
+        The first call runs the full initial search.
+        """
+        graph = self.graph
+        self._open = graph.passable()
+        self._weights = graph.weights()
+        self._er, self._ec = divmod(self._e, graph.stride)
+        offsets = graph.offsets
+        g, rhs = self.g, self.rhs
+        changed, self._changed = self._changed, []
+        # Cells still queued from the last run were drained by its final event
+        self._touched = set(self._queued)
+        # Counters cover this run only; relaxations are rhs recomputations
+        self._relaxations = self._pushes = self._stale_pops = 0
+        self._peak = len(self._heap)
+        for v in changed:
+            self._update_vertex(v)
+            for off in offsets:
+                self._update_vertex(v + off)
+        visited = set()
+        expanded = 0
+        e = self._e
+        while True:
+            top = self._top()
+            if top is None or (top >= self._key(e) and g[e] == rhs[e]):
+                break
+            _, _, u = heapq.heappop(self._heap)
+            del self._queued[u]
+            self._touched.add(u)
+            expanded += 1
+            if g[u] > rhs[u]:
+                # Overconsistent: the distance dropped, settle it
+                g[u] = rhs[u]
+            else:
+                # Underconsistent: the distance grew, reopen the cell
+                g[u] = float('inf')
+                self._update_vertex(u)
+            for off in offsets:
+                if self._open[u + off]:
+                    self._update_vertex(u + off)
+            visited.add(graph.cell(u))
+            yield self._event(u, visited, snapshot)
+        frontier = {graph.cell(v) for v in self._queued}
+        cost = g[e] if g[e] != float('inf') else None
+        yield _final_event(self.path(), visited, frontier, snapshot, expanded, cost=cost,
+                           relaxations=self._relaxations, pushes=self._pushes,
+                           stale_pops=self._stale_pops, peak_frontier=self._peak)
+
+    def replan(self):
+        """Run steps() to completion and return its final event."""
+        for step in self.steps():
+            pass
+        return step
+
+@_timed_stepwise
+def lpa_stepwise(start, end, rows, cols, grid, snapshot=False):
+    # The final event also carries the planner under "planner", so callers can
+    # keep repairing the same search after editing the grid.
+    planner = LPAStar(grid, start, end)
+    for step in planner.steps(snapshot):
+        if "path" in step:
+            step["planner"] = planner
+        yield step
+
+STEPWISE = {
+    "dijkstra": dijkstra_stepwise,
+    "astar": astar_stepwise,
+    "bfs": bfs_stepwise,
+    "dfs": dfs_stepwise,
+    "dial": dial_stepwise,
+    "bi-dijkstra": bidirectional_dijkstra_stepwise,
+    "bi-astar": bidirectional_astar_stepwise,
+    "bi-bfs": bidirectional_bfs_stepwise,
+    "jps": jps_stepwise,
+    "field": distance_field_stepwise,
+    "lpa": lpa_stepwise,
+}
+
+# Headless solvers
+# ----------------
+# The solve_* functions return the same paths as their *_stepwise counterparts
+# but skip the generator, the visited/frontier sets and all per-step events.
+# Cells are addressed by flat index into the padded GridGraph, whose wall border
+# makes neighbour expansion a plain offset add. The result is a dict with
+# "path" (list of (row, col) cells), "cost" (None when unreachable),
+# "expanded" (number of settled cells) and the same counters as the final step
+# event, with "algo_ns" covering the whole call.
+
+def _path_cost(path, graph):
+    # Sum of the terrain costs of every cell entered after the first
+    costs = graph.cost_cells
+    return sum(int(costs[r, c]) for r, c in path[1:])
+
+def _solve_result(path, expanded, cost, **report):
+    return {"path": path, "cost": cost if path else None, "expanded": expanded, **report}
+
+def _timed_solver(solver):
+    @wraps(solver)
+    def wrapper(*args, **kwargs):
+        t0 = perf_counter_ns()
+        result = solver(*args, **kwargs)
+        result["algo_ns"] = perf_counter_ns() - t0
+        return result
+    return wrapper
+
+@_timed_solver
+def solve_dijkstra(start, end, rows, cols, grid, queue="heapq"):
+    graph = as_grid_graph(grid)
+    open_ = graph.passable()
+    weights = graph.weights()
+    offsets = graph.offsets
+    s, e = graph.index(start), graph.index(end)
+    n = len(open_)
+    dist = [float('inf')] * n
+    prev = [-1] * n
+    done = bytearray(n)
+    dist[s] = 0
+    pq = make_queue(queue)
+    push, pop = pq.update, pq.pop
+    push(s, 0)
+    expanded = 0
+    relaxations, pushes, stale_pops = 0, 1, 0
+    while pq:
+        d, u = pop()
+        if done[u]:
+            stale_pops += 1
+            continue
+        done[u] = 1
+        expanded += 1
+        if u == e:
+            break
+        for off in offsets:
+            v = u + off
+            if open_[v]:
+                relaxations += 1
+                nd = d + weights[v]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    prev[v] = u
+                    push(v, nd)
+                    pushes += 1
+    path = _flat_path(prev, s, e, graph)
+    return _solve_result(path, expanded, dist[e], queue=queue, peak_queue=pq.peak, relaxations=relaxations,
+                         pushes=pushes, stale_pops=stale_pops, peak_frontier=pq.peak)
+
+@_timed_solver
+def solve_astar(start, end, rows, cols, grid, queue="heapq"):
+    graph = as_grid_graph(grid)
+    open_ = graph.passable()
+    weights = graph.weights()
+    offsets = graph.offsets
+    stride = graph.stride
+    s, e = graph.index(start), graph.index(end)
+    # Heuristic in padded coordinates
+    er, ec = end[0] + 1, end[1] + 1
+    n = len(open_)
+    g_score = [float('inf')] * n
+    prev = [-1] * n
+    done = bytearray(n)
+    g_score[s] = 0
+    pq = make_queue(queue)
+    push, pop = pq.update, pq.pop
+    push(s, abs(start[0] - end[0]) + abs(start[1] - end[1]))
+    expanded = 0
+    relaxations, pushes, stale_pops = 0, 1, 0
+    while pq:
+        _, u = pop()
+        if done[u]:
+            stale_pops += 1
+            continue
+        done[u] = 1
+        expanded += 1
+        if u == e:
+            break
+        g = g_score[u]
+        for off in offsets:
+            v = u + off
+            if open_[v]:
+                relaxations += 1
+                ng = g + weights[v]
+                if ng < g_score[v]:
+                    g_score[v] = ng
+                    prev[v] = u
+                    r, c = divmod(v, stride)
+                    push(v, ng + abs(r - er) + abs(c - ec))
+                    pushes += 1
+    path = _flat_path(prev, s, e, graph)
+    return _solve_result(path, expanded, g_score[e], queue=queue, peak_queue=pq.peak, relaxations=relaxations,
+                         pushes=pushes, stale_pops=stale_pops, peak_frontier=pq.peak)
+
+@_timed_solver
+def solve_dial(start, end, rows, cols, grid):
+    graph = as_grid_graph(grid)
+    open_ = graph.passable()
+    weights = graph.weights()
+    offsets = graph.offsets
+    s, e = graph.index(start), graph.index(end)
+    n = len(open_)
+    nbuckets = graph.max_cost() + 1
+    buckets = [[] for _ in range(nbuckets)]
+    dist = [float('inf')] * n
+    prev = [-1] * n
+    done = bytearray(n)
+    dist[s] = 0
+    buckets[0].append(s)
+    pending = 1
+    d = 0
+    expanded = 0
+    relaxations, pushes, stale_pops, peak_frontier = 0, 1, 0, 1
+    while pending:
+        bucket = buckets[d % nbuckets]
+        if not bucket:
+            d += 1
+            continue
+        u = bucket.pop()
+        pending -= 1
+        if done[u] or dist[u] != d:
+            stale_pops += 1
+            continue
+        done[u] = 1
+        expanded += 1
+        if u == e:
+            break
+        for off in offsets:
+            v = u + off
+            if open_[v]:
+                relaxations += 1
+                nd = d + weights[v]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    prev[v] = u
+                    buckets[nd % nbuckets].append(v)
+                    pending += 1
+                    pushes += 1
+        if pending > peak_frontier:
+            peak_frontier = pending
+    path = _flat_path(prev, s, e, graph)
+    return _solve_result(path, expanded, dist[e], relaxations=relaxations, pushes=pushes,
+                         stale_pops=stale_pops, peak_frontier=peak_frontier)
+
+@_timed_solver
+def solve_bfs(start, end, rows, cols, grid):
+    graph = as_grid_graph(grid)
+    open_ = graph.passable()
+    offsets = graph.offsets
+    s, e = graph.index(start), graph.index(end)
+    n = len(open_)
+    prev = [-1] * n
+    # Cells are marked when they are enqueued, like the frontier check in
+    # bfs_stepwise, so both settle the same cells in the same order.
+    seen = bytearray(n)
+    seen[s] = 1
+    queue = deque([s])
+    expanded = 0
+    # Cells are never queued twice, so there are no stale pops
+    relaxations, pushes, peak_frontier = 0, 1, 1
+    while queue:
+        u = queue.popleft()
+        expanded += 1
+        if u == e:
+            break
+        for off in offsets:
+            v = u + off
+            if open_[v]:
+                relaxations += 1
+                if not seen[v]:
+                    seen[v] = 1
+                    prev[v] = u
+                    queue.append(v)
+                    pushes += 1
+        if len(queue) > peak_frontier:
+            peak_frontier = len(queue)
+    path = _flat_path(prev, s, e, graph)
+    return _solve_result(path, expanded, _path_cost(path, graph), relaxations=relaxations, pushes=pushes,
+                         stale_pops=0, peak_frontier=peak_frontier)
+
+@_timed_solver
+def solve_dfs(start, end, rows, cols, grid):
+    graph = as_grid_graph(grid)
+    open_ = graph.passable()
+    offsets = graph.offsets
+    s, e = graph.index(start), graph.index(end)
+    n = len(open_)
+    prev = [-1] * n
+    done = bytearray(n)
+    stack = [s]
+    expanded = 0
+    relaxations, pushes, stale_pops, peak_frontier = 0, 1, 0, 1
     while stack:
-        r, c = stack.pop()
-        if (r, c) in visited:
+        u = stack.pop()
+        if done[u]:
+            stale_pops += 1
             continue
-        visited.add((r, c))
-        frontier.discard((r, c))
-        yield {
-            "visited": visited.copy(),
-            "frontier": frontier.copy(),
-            "current": (r, c),
-        }
-        if (r, c) == end:
+        done[u] = 1
+        expanded += 1
+        if u == e:
             break
-        for dr, dc in DIRECTIONS:
-            nr, nc = r + dr, c + dc
-            if 0 <= nr < rows and 0 <= nc < cols and grid[nr][nc] == 0 and (nr, nc) not in visited:
-                stack.append((nr, nc))
-                if prev[nr][nc] is None:
-                    prev[nr][nc] = (r, c)
-                frontier.add((nr, nc))
-    path = reconstruct_path(prev, start, end)
-    yield {
-        "visited": visited,
-        "frontier": set(),
-        "current": None,
-        "path": path,
-    }
+        for off in offsets:
+            v = u + off
+            if open_[v]:
+                relaxations += 1
+                if not done[v]:
+                    stack.append(v)
+                    pushes += 1
+                    # Like dfs_stepwise, the first cell to push v stays its parent
+                    if prev[v] == -1 and v != s:
+                        prev[v] = u
+        if len(stack) > peak_frontier:
+            peak_frontier = len(stack)
+    path = _flat_path(prev, s, e, graph)
+    return _solve_result(path, expanded, _path_cost(path, graph), relaxations=relaxations, pushes=pushes,
+                         stale_pops=stale_pops, peak_frontier=peak_frontier)
+
+def _solve_bidirectional(start, end, grid, kind):
+    # Flat-index version of _bidirectional_stepwise with the same stopping rule
+    graph = as_grid_graph(grid)
+    open_ = graph.passable()
+    weights = graph.weights()
+    offsets = graph.offsets
+    stride = graph.stride
+    n = len(open_)
+    s, e = graph.index(start), graph.index(end)
+    targets = (divmod(e, stride), divmod(s, stride))
+    dist = ([float('inf')] * n, [float('inf')] * n)
+    prev = ([-1] * n, [-1] * n)
+    done = (bytearray(n), bytearray(n))
+    dist[0][s] = 0
+    dist[1][e] = 0
+    if kind == "bfs":
+        queues = (deque([(0, s)]), deque([(0, e)]))
+    elif kind == "astar":
+        h = abs(start[0] - end[0]) + abs(start[1] - end[1])
+        queues = ([(h, s)], [(h, e)])
+    else:
+        queues = ([(0, s)], [(0, e)])
+    best, meet = (0, s) if s == e else (float('inf'), -1)
+    expanded = 0
+    relaxations, pushes, stale_pops, peak_frontier = 0, 2, 0, 2
+    while queues[0] and queues[1]:
+        top0, top1 = queues[0][0][0], queues[1][0][0]
+        if kind == "astar":
+            if max(top0, top1) >= best:
+                break
+        elif top0 + top1 >= best:
+            break
+        side = 0 if len(queues[0]) <= len(queues[1]) else 1
+        queue = queues[side]
+        if kind == "bfs":
+            _, u = queue.popleft()
+        else:
+            _, u = heapq.heappop(queue)
+        side_done = done[side]
+        if side_done[u]:
+            stale_pops += 1
+            continue
+        side_done[u] = 1
+        expanded += 1
+        own, other, own_prev = dist[side], dist[1 - side], prev[side]
+        tr, tc = targets[side]
+        d = own[u]
+        for off in offsets:
+            v = u + off
+            if not open_[v]:
+                continue
+            relaxations += 1
+            if kind == "bfs":
+                nd = d + 1
+            elif side == 0:
+                nd = d + weights[v]
+            else:
+                nd = d + weights[u]
+            if nd < own[v]:
+                own[v] = nd
+                own_prev[v] = u
+                if kind == "bfs":
+                    queue.append((nd, v))
+                elif kind == "astar":
+                    r, c = divmod(v, stride)
+                    heapq.heappush(queue, (nd + abs(r - tr) + abs(c - tc), v))
+                else:
+                    heapq.heappush(queue, (nd, v))
+                pushes += 1
+                if nd + other[v] < best:
+                    best = nd + other[v]
+                    meet = v
+        size = len(queues[0]) + len(queues[1])
+        if size > peak_frontier:
+            peak_frontier = size
+    counters = {"relaxations": relaxations, "pushes": pushes, "stale_pops": stale_pops, "peak_frontier": peak_frontier}
+    if meet == -1:
+        return _solve_result([], expanded, None, **counters)
+    forward = _flat_path(prev[0], s, meet, graph)
+    cur = prev[1][meet]
+    while cur != -1:
+        forward.append(graph.cell(cur))
+        cur = prev[1][cur]
+    return _solve_result(forward, expanded, _path_cost(forward, graph), **counters)
 
-def astar_stepwise(start, end, rows, cols, grid):
-    def heuristic(a, b):
-        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+@_timed_solver
+def solve_bidirectional_bfs(start, end, rows, cols, grid):
+    return _solve_bidirectional(start, end, grid, "bfs")
 
-    g_score = [[float('inf')] * cols for _ in range(rows)]
-    f_score = [[float('inf')] * cols for _ in range(rows)]
-    prev = [[None] * cols for _ in range(rows)]
-    g_score[start[0]][start[1]] = 0
-    f_score[start[0]][start[1]] = heuristic(start, end)
-    heap = [(f_score[start[0]][start[1]], start)]
-    visited = set()
-    frontier = {start}
+@_timed_solver
+def solve_bidirectional_dijkstra(start, end, rows, cols, grid):
+    return _solve_bidirectional(start, end, grid, "dijkstra")
+
+@_timed_solver
+def solve_bidirectional_astar(start, end, rows, cols, grid):
+    return _solve_bidirectional(start, end, grid, "astar")
+
+@_timed_solver
+def solve_jps(start, end, rows, cols, grid):
+    graph = _uniform_graph(grid)
+    open_ = graph.passable()
+    stride = graph.stride
+    s, e = graph.index(start), graph.index(end)
+    er, ec = divmod(e, stride)
+    n = len(open_)
+    g_score = [float('inf')] * n
+    prev = [-1] * n
+    done = bytearray(n)
+    g_score[s] = 0
+    heap = [(abs(start[0] - end[0]) + abs(start[1] - end[1]), s)]
+    expanded = 0
+    relaxations, pushes, stale_pops, peak_frontier = 0, 1, 0, 1
     while heap:
-        _, (r, c) = heapq.heappop(heap)
-        if (r, c) in visited:
+        _, u = heapq.heappop(heap)
+        if done[u]:
+            stale_pops += 1
             continue
-        visited.add((r, c))
-        frontier.discard((r, c))
-        yield {
-            "visited": visited.copy(),
-            "frontier": frontier.copy(),
-            "current": (r, c),
-        }
-        if (r, c) == end:
+        done[u] = 1
+        expanded += 1
+        if u == e:
             break
-        for dr, dc in DIRECTIONS:
-            nr, nc = r + dr, c + dc
-            if 0 <= nr < rows and 0 <= nc < cols and grid[nr][nc] == 0:
-                tentative_g = g_score[r][c] + 1
-                if tentative_g < g_score[nr][nc]:
-                    g_score[nr][nc] = tentative_g
-                    f_score[nr][nc] = tentative_g + heuristic((nr, nc), end)
-                    prev[nr][nc] = (r, c)
-                    heapq.heappush(heap, (f_score[nr][nc], (nr, nc)))
-                    frontier.add((nr, nc))
-    path = reconstruct_path(prev, start, end)
-    yield {
-        "visited": visited,
-        "frontier": set(),
-        "current": None,
-        "path": path,
-    }
+        ur, uc = divmod(u, stride)
+        for d in _jps_directions(u, prev[u], stride):
+            v = _jps_jump(open_, u, d, stride, e)
+            if v == -1 or done[v]:
+                continue
+            relaxations += 1
+            vr, vc = divmod(v, stride)
+            ng = g_score[u] + abs(vr - ur) + abs(vc - uc)
+            if ng < g_score[v]:
+                g_score[v] = ng
+                prev[v] = u
+                heapq.heappush(heap, (ng + abs(vr - er) + abs(vc - ec), v))
+                pushes += 1
+        if len(heap) > peak_frontier:
+            peak_frontier = len(heap)
+    path = _jps_path(prev, s, e, graph)
+    return _solve_result(path, expanded, g_score[e], relaxations=relaxations, pushes=pushes,
+                         stale_pops=stale_pops, peak_frontier=peak_frontier)
+
+@_timed_solver
+def solve_lpa(start, end, rows, cols, grid):
+    step = LPAStar(grid, start, end).replan()
+    counters = {key: step[key] for key in ("relaxations", "pushes", "stale_pops", "peak_frontier")}
+    return _solve_result(step["path"], step["expanded"], step["cost"], **counters)
+
+SOLVERS = {
+    "dijkstra": solve_dijkstra,
+    "astar": solve_astar,
+    "bfs": solve_bfs,
+    "dfs": solve_dfs,
+    "dial": solve_dial,
+    "bi-dijkstra": solve_bidirectional_dijkstra,
+    "bi-astar": solve_bidirectional_astar,
+    "bi-bfs": solve_bidirectional_bfs,
+    "jps": solve_jps,
+    "lpa": solve_lpa,
+}
+
+# Algorithms whose stepwise and headless versions take queue= (a key of
+# priority_queues.QUEUES)
+QUEUE_ALGORITHMS = ("dijkstra", "astar")
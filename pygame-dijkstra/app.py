@@ -1,28 +1,71 @@
 import pygame
-from algorithms import dijkstra_stepwise, astar_stepwise, dfs_stepwise, bfs_stepwise
-from maze_generators import generate_maze_type_3
+from algorithms import QUEUE_ALGORITHMS, SOLVERS, STEPWISE, LPAStar, apply_step
+from maze_generators import generate_maze_eller, generate_maze_type_3
+from grid_graph import GridGraph, MIN_COST, MAX_COST
+from priority_queues import QUEUES
+from run_cache import RunCache, ZobristHash
+from connectivity import ConnectivityIndex
+from maze_io import open_packed, save_packed
+from renderer import COLOR_BG, GridRenderer
+from search_worker import WORKER_AVAILABLE, SearchWorker
+from race import RACE_ALGORITHMS, RACE_REPEATS, Race
+from collections import deque
+from functools import lru_cache
+import random
 import time
 """
 Path-finding Visualization with Pygame
 
-This application visualizes several path-finding algorithms (Dijkstra, A*, BFS, DFS) on a grid using Pygame.
-Users can interactively set walls, start, and end points, generate mazes, and observe the algorithm's progress step by step.
+This application visualizes several path-finding algorithms (Dijkstra, A*, BFS, DFS, JPS, Dial) on a grid using Pygame.
+Users can interactively set walls, terrain costs, start, and end points, generate mazes, and observe the algorithm's progress step by step.
 
 Features:
-    - Interactive grid for drawing/removing walls.
+    - Interactive grid for drawing/removing walls and painting terrain costs.
     - Move start/end points with mouse.
-    - Visualize Dijkstra, A*, BFS, and DFS algorithms.
+    - Visualize Dijkstra, A*, BFS, DFS and Jump Point Search algorithms.
     - Maze generation and clearing.
-    - Displays elapsed time and recent run history.
+    - Displays elapsed time and recent run history with each run's search counters
+      (settled cells, relaxations, pushes, stale pops, peak frontier, algorithm time).
+    - Finished runs are cached per (grid, start, end, algorithm); rerunning an
+      unchanged setup is shown instantly.
+    - An end walled off from the start is reported at once from a component index.
+    - Save and load the maze as a bit-packed .maze file, with its start, end,
+      generator type and seed.
+    - Layered incremental rendering (renderer.py): a cached background with
+      the grid lines, a wall layer rebuilt only on edits, and per frame only
+      the cells whose look changed; HUD fonts and text surfaces are reused.
+    - Frame-budget scheduler: each frame consumes search steps up to the chosen
+      speed (1 to 10000 steps, or as many as fit) within FRAME_BUDGET_MS, and an
+      instant mode runs the headless solver; search and render time are shown
+      separately.
+    - Worker mode: the search runs in another process (search_worker.py) and
+      streams its step events back, so input and rendering never wait for it;
+      editing the grid cancels the run.
+    - Race mode: Dijkstra, A*, BFS and DFS side by side in four mini viewports,
+      with a leaderboard timed on a process pool around the solvers only (race.py).
 
 Controls:
     - Left-click & drag: Draw/remove walls.
+    - Shift + left-click & drag: Paint terrain with the brush cost (again to erase).
+    - [ / ]: Decrease/increase the terrain brush cost (1-9).
     - Right-click: Move start point.
     - Middle-click: Move end point.
-    - 1/2/3/4: Switch algorithm (Dijkstra/A*/DFS/BFS).
+    - 1/2/3/4/5/6: Switch algorithm (Dijkstra/A*/DFS/BFS/Jump Point Search/Dial).
+    - 7: BFS distance field from the start, drawn as a heat map one wavefront per frame.
+    - 8: LPA* (incremental). After a run, edits and start/end moves repair the
+      search in place and the path updates live while dragging.
+    - B: Toggle the bidirectional variant of Dijkstra, A* or BFS.
+    - Q: Cycle the priority queue used by Dijkstra and A* (heapq/indexed/radix).
     - SPACE: Start visualization.
-    - TAB: Generate maze.
+    - TAB: Generate maze (Shift + TAB: perfect maze by Eller's algorithm).
     - ` (backquote): Clear grid.
+    - S / L: Save the maze to / load it from MAZE_FILE.
+    - F: Toggle between the layered renderer and a full repaint every frame;
+      the overlay shows the render time of each.
+    - - / =: Slower/faster search (steps per frame).
+    - I: Toggle instant mode (headless solver, only the result is drawn).
+    - W: Toggle worker mode (search in a background process).
+    - R: Toggle race mode; SPACE then starts the race.
 
 Modules:
     - pygame: Rendering and user interaction.
@@ -32,13 +75,17 @@ Modules:
 Main Components:
     - Grid state and rendering.
     - Event handling for mouse and keyboard.
-    - Stepwise algorithm execution and visualization.
+    - Stepwise algorithm execution and visualization, scheduled per frame budget.
+    - Dirty-rectangle rendering from a per-cell buffer of drawn looks (renderer.py).
     - History tracking for recent runs.
+    - Run cache keyed by an incremental Zobrist hash of the grid.
 """
 
 # --- Constants ---
 ROWS, COLS = 30, 45
 CELL_SIZE = 15
+# File used by the S (save) and L (load) keys
+MAZE_FILE = "saved.maze"
 WIDTH, HEIGHT = 1440, 720
 # Center the grid in the window
 GRID_OFFSET = (
@@ -53,172 +100,309 @@ pygame.display.set_caption("Path-finding Visualization - Where's Jerry?")
 clock = pygame.time.Clock()
 
 # --- Grid and State ---
-grid = [[0 for _ in range(COLS)] for _ in range(ROWS)]
+grid = GridGraph(ROWS, COLS)
+# Hash of walls and terrain, updated per cell edit, and the cache of finished runs
+grid_hash = ZobristHash(ROWS, COLS)
+grid_hash.rehash(grid)
+run_cache = RunCache()
+run_key = None
+# Components of the open cells, for instant "no path" answers
+connectivity = ConnectivityIndex(grid)
 start = (0, 0)
 end = (ROWS - 1, COLS - 1)
+# Generator type and seed of the current maze, saved with it (0 and -1 when drawn by hand)
+maze_generator = 0
+maze_seed = -1
 path = []
 mouse_down = False
 drawing_wall = None
+# Terrain painting: brush cost and the cost being painted during a shift-drag
+terrain_brush = 5
+painting_terrain = None
+# One-line message for errors such as JPS on weighted terrain
+status_message = ""
 
-# Algorithm mode: "dijkstra" or "astar"
+# Algorithm mode: a key of algorithms.STEPWISE ("dijkstra", "astar", "bi-bfs", ...)
 algorithm_mode = "dijkstra"
+# Search scheduler: steps consumed per frame (None: as many as fit), always
+# stopping once FRAME_BUDGET_MS of search time is spent so the frame rate holds
+FRAME_BUDGET_MS = 8
+SPEEDS = (1, 10, 100, 1000, 10000, None)
+speed_index = 0
+# Instant mode: run the headless solver and draw only its result
+instant_mode = False
+# Worker mode: run the search in a background process (not for LPA*, whose
+# planner must stay in this process for live repairs)
+worker_mode = False
+
+# Priority queue for the algorithms that accept one (a key of priority_queues.QUEUES)
+queue_mode = "heapq"
+# Modes that run even when the end is walled off: the distance field covers
+# every reachable cell, and LPA* keeps its planner to repair once a wall is removed
+FULL_SEARCHES = ("field", "lpa")
 
 # Dijkstra visualization state
 dijkstra_running = False
 dijkstra_gen = None
 visited = set()
 frontier = set()
+# Distance-field mode: BFS level of every reached cell, for the heat map
+heat = {}
+heat_max = 0
+# LPA* mode: planner of the last finished run, repaired after every edit
+planner = None
+# Race mode: one lane per race algorithm (its search and live sets), and the
+# headless runs timed in the background for the leaderboard
+race_mode = False
+race_lanes = []
+race_run = None
 
 # --- Helper Functions ---
 
 def get_cell_from_pos(pos):
-    x, y = pos
-    col = (x - GRID_OFFSET[0]) // CELL_SIZE
-    row = (y - GRID_OFFSET[1]) // CELL_SIZE
-    if 0 <= row < ROWS and 0 <= col < COLS:
-        return (row, col)
+    # In race mode every viewport edits the same grid
+    for view in (race_views if race_mode else (renderer,)):
+        cell = view.cell_at(pos)
+        if cell is not None:
+            return cell
     return None
 
 # Load mouse and cheese icons (ensure these files exist in your project directory)
-mouse_icon = pygame.image.load("tom.jpg")
-cheese_icon = pygame.image.load("jerry.png")
-mouse_icon = pygame.transform.smoothscale(mouse_icon, (CELL_SIZE - 4, CELL_SIZE - 4))
-cheese_icon = pygame.transform.smoothscale(cheese_icon, (CELL_SIZE - 4, CELL_SIZE - 4))
-
-def draw_grid():
-    # Color palette: black walls, off-white background
-    COLOR_BG = (245, 245, 245)         # Off-white background
-    COLOR_GRID = (0, 0, 0)             # Black grid lines (outer border)
-    COLOR_INNER_GRID = (200, 200, 200) # Light gray for inner grid lines
-    COLOR_WALL = (0, 0, 0)             # Black for walls
-    COLOR_PATH = (128, 0, 255)         # Purple for final path
-    COLOR_VISITED = (255, 128, 192)    # Pink for visited (initial path)
-    COLOR_FRONTIER = (0, 168, 0)       # Green for frontier
-
-    # Fill background
-    screen.fill(COLOR_BG)
-
-    # Draw outer border
-    outer_rect = pygame.Rect(
-        GRID_OFFSET[0],
-        GRID_OFFSET[1],
-        COLS * CELL_SIZE,
-        ROWS * CELL_SIZE
-    )
-    pygame.draw.rect(screen, COLOR_GRID, outer_rect, width=2)
-
-    # Draw inner grid lines (vertical and horizontal)
-    for row in range(1, ROWS):
-        y = GRID_OFFSET[1] + row * CELL_SIZE
-        pygame.draw.line(
-            screen, COLOR_INNER_GRID,
-            (GRID_OFFSET[0], y),
-            (GRID_OFFSET[0] + COLS * CELL_SIZE, y),
-            width=1
-        )
-    for col in range(1, COLS):
-        x = GRID_OFFSET[0] + col * CELL_SIZE
-        pygame.draw.line(
-            screen, COLOR_INNER_GRID,
-            (x, GRID_OFFSET[1]),
-            (x, GRID_OFFSET[1] + ROWS * CELL_SIZE),
-            width=1
-        )
-
-    # Draw cells (no inner grid lines)
-    for row in range(ROWS):
-        for col in range(COLS):
-            cell = (row, col)
-            border_radius = 6
-            rect_x = GRID_OFFSET[0] + col * CELL_SIZE + 2
-            rect_y = GRID_OFFSET[1] + row * CELL_SIZE + 2
-            rect_w = CELL_SIZE - 4
-            rect_h = CELL_SIZE - 4
-
-            if cell == start:
-                # Draw mouse icon
-                screen.blit(mouse_icon, (rect_x, rect_y))
-            elif cell == end:
-                # Draw cheese icon
-                screen.blit(cheese_icon, (rect_x, rect_y))
-            elif grid[row][col] == 1:
-                color = COLOR_WALL
-                wall_margin = 0
-                rect_x = GRID_OFFSET[0] + col * CELL_SIZE + wall_margin
-                rect_y = GRID_OFFSET[1] + row * CELL_SIZE + wall_margin
-                rect_w = CELL_SIZE - 2 * wall_margin
-                rect_h = CELL_SIZE - 2 * wall_margin
-                border_radius = 0
-                pygame.draw.rect(
-                    screen,
-                    color,
-                    (
-                        rect_x,
-                        rect_y,
-                        rect_w,
-                        rect_h,
-                    ),
-                    border_radius=border_radius
-                )
-            elif cell in path:
-                color = COLOR_PATH
-                pygame.draw.rect(
-                    screen,
-                    color,
-                    (
-                        rect_x,
-                        rect_y,
-                        rect_w,
-                        rect_h,
-                    ),
-                    border_radius=border_radius
-                )
-            elif cell in visited:
-                color = COLOR_VISITED
-                pygame.draw.rect(
-                    screen,
-                    color,
-                    (
-                        rect_x,
-                        rect_y,
-                        rect_w,
-                        rect_h,
-                    ),
-                    border_radius=border_radius
-                )
-            elif cell in frontier:
-                color = COLOR_FRONTIER
-                pygame.draw.rect(
-                    screen,
-                    color,
-                    (
-                        rect_x,
-                        rect_y,
-                        rect_w,
-                        rect_h,
-                    ),
-                    border_radius=border_radius
-                )
-
-    # Draw outer border LAST so it appears above wall cells
-    pygame.draw.rect(screen, COLOR_GRID, outer_rect, width=2)
+mouse_image = pygame.image.load("tom.jpg")
+cheese_image = pygame.image.load("jerry.png")
+mouse_icon = pygame.transform.smoothscale(mouse_image, (CELL_SIZE - 4, CELL_SIZE - 4))
+cheese_icon = pygame.transform.smoothscale(cheese_image, (CELL_SIZE - 4, CELL_SIZE - 4))
+
+renderer = GridRenderer(screen, GRID_OFFSET, ROWS, COLS, CELL_SIZE, mouse_icon, cheese_icon)
+
+# Race viewports: one row of small grids across the band of the main grid,
+# each under a label line
+RACE_CELL = 7
+RACE_LABEL_HEIGHT = 26
+RACE_GAP = (WIDTH - len(RACE_ALGORITHMS) * COLS * RACE_CELL) // (len(RACE_ALGORITHMS) + 1)
+race_icons = [pygame.transform.smoothscale(image, (RACE_CELL - 4, RACE_CELL - 4)) for image in (mouse_image, cheese_image)]
+race_views = [
+    GridRenderer(screen, (RACE_GAP + i * (COLS * RACE_CELL + RACE_GAP), renderer.rect.top + RACE_LABEL_HEIGHT),
+                 ROWS, COLS, RACE_CELL, *race_icons)
+    for i in range(len(RACE_ALGORITHMS))
+]
+# Every view of the grid, told about each wall and terrain edit
+VIEWS = (renderer, *race_views)
+
+# --- HUD ---
+# Text panels above and below the grid, repainted only when their text changes
+FONT_LARGE = pygame.font.SysFont(None, 28)
+FONT_SMALL = pygame.font.SysFont(None, 24)
+TOP_PANEL = pygame.Rect(0, 0, WIDTH, 20 + 2 * (FONT_LARGE.get_height() + 4))
+OVERLAY_PANEL = pygame.Rect(0, TOP_PANEL.bottom, WIDTH, renderer.rect.top - TOP_PANEL.bottom)
+BOTTOM_PANEL = pygame.Rect(0, renderer.rect.bottom, WIDTH, HEIGHT - renderer.rect.bottom)
+RACE_LABEL_PANELS = [pygame.Rect(view.rect.x, renderer.rect.top, view.rect.width, RACE_LABEL_HEIGHT) for view in race_views]
+RACE_BOARD_PANEL = pygame.Rect(0, race_views[0].rect.bottom + 10, WIDTH, renderer.rect.bottom - race_views[0].rect.bottom - 10)
+drawn_panels = {}
+# Set when the layout changes (race mode) so the next frame paints the whole window
+needs_repaint = True
+# Render time and composed grid cells of recent frames, for the frame-time
+# overlay; both stay flat however many cells the search has reached
+frame_times = deque(maxlen=60)
+frame_cells = deque(maxlen=60)
+frame_count = 0
+frame_text = ""
+# F toggles the old way of drawing (fonts created and everything repainted
+# every frame, then flip()) so the overlay can compare the two
+full_redraw = False
+
+@lru_cache(maxsize=256)
+def text_surface(font, text, color):
+    return font.render(text, True, color)
+
+def draw_panel(rect, lines):
+    """Repaint rect with lines of (font, text, color, position) if they changed; returns dirty rects."""
+    if not full_redraw and drawn_panels.get(tuple(rect)) == lines:
+        return []
+    drawn_panels[tuple(rect)] = lines
+    screen.fill(COLOR_BG, rect)
+    for font, text, color, pos in lines:
+        if full_redraw:
+            surface = font.render(text, True, color)
+        else:
+            surface = text_surface(font, text, color)
+        screen.blit(surface, pos)
+    return [rect]
+
+def set_wall(cell, wall):
+    if grid[cell[0]][cell[1]] != wall:
+        grid[cell[0]][cell[1]] = wall
+        grid_hash.toggle_wall(cell)
+        if wall:
+            connectivity.wall_added(cell)
+        else:
+            connectivity.wall_removed(cell)
+        for view in VIEWS:
+            view.edit((cell,))
+
+def set_terrain(cell, cost):
+    old = int(grid.cost_cells[cell[0], cell[1]])
+    grid.set_cost(cell, cost)
+    grid_hash.change_cost(cell, old, int(grid.cost_cells[cell[0], cell[1]]))
+    for view in VIEWS:
+        view.edit((cell,))
+
+def grid_replaced():
+    # Maze generated, cleared or loaded
+    grid_hash.rehash(grid)
+    connectivity.rebuild()
+    for view in VIEWS:
+        view.rebuild()
+    reset_path_states()
+
+def paintable(cell):
+    # Walls and endpoints keep their cost: it would not show, yet it would
+    # still change the grid hash and be saved
+    return cell != start and cell != end and grid[cell[0]][cell[1]] == 0
+
+def repair_live():
+    # Repair the LPA* search; visited shows only the cells expanded by the repair
+    global status_message
+    t0 = time.perf_counter()
+    visited.clear()
+    frontier.clear()
+    for step in planner.steps():
+        apply_step(step, visited, frontier)
+    path.clear()
+    path.extend(step["path"])
+    renderer.mark_all()
+    status_message = f"LPA* repair: {step['expanded']} cells in {1000 * (time.perf_counter() - t0):.2f} ms"
+
+def grid_edited(cell):
+    if planner is not None and not dijkstra_running:
+        planner.cell_changed(cell)
+        repair_live()
+    else:
+        reset_path_states()
+
+def endpoints_moved():
+    global planner
+    if planner is not None and not dijkstra_running:
+        # LPA* keeps distances from a fixed start and heuristic to a fixed end
+        planner = LPAStar(grid, start, end)
+        repair_live()
+    else:
+        reset_path_states()
+
+def stop_worker(steps):
+    if isinstance(steps, SearchWorker):
+        steps.cancel()
 
 def reset_path_states():
-    global path, visited, frontier, dijkstra_running, dijkstra_gen
+    global path, visited, frontier, dijkstra_running, dijkstra_gen, planner, race_run
+    stop_worker(dijkstra_gen)
+    for lane in race_lanes:
+        stop_worker(lane["steps"])
+    race_lanes.clear()
+    if race_run is not None:
+        race_run.cancel()
+        race_run = None
     path.clear()
     visited.clear()
     frontier.clear()
+    heat.clear()
+    for view in VIEWS:
+        view.mark_all()
     dijkstra_running = False
     dijkstra_gen = None
+    planner = None
+
+def start_race():
+    # Headless solvers for the leaderboard, polled every frame, and one
+    # animated search per lane
+    global race_run
+    race_run = Race(grid, start, end, queue=queue_mode)
+    for name, view in zip(RACE_ALGORITHMS, race_views):
+        options = {"queue": queue_mode} if name in QUEUE_ALGORITHMS else {}
+        steps = STEPWISE[name](start, end, rows=ROWS, cols=COLS, grid=grid, **options)
+        if worker_mode:
+            steps = SearchWorker(steps, COLS)
+        race_lanes.append({"name": name, "steps": steps, "view": view, "visited": set(), "frontier": set(),
+                           "path": [], "running": True})
+
+def advance_lane(lane, limit, deadline):
+    # The main scheduler for one race lane, without history or cache
+    steps = 0
+    while lane["running"]:
+        try:
+            step = next(lane["steps"])
+        except (StopIteration, RuntimeError):
+            lane["running"] = False
+            break
+        if step is None:
+            break
+        apply_step(step, lane["visited"], lane["frontier"])
+        lane["view"].mark_step(step)
+        if "path" in step:
+            lane["path"] = step["path"]
+            lane["view"].mark_path()
+            lane["running"] = False
+            break
+        steps += 1
+        if steps == limit or (deadline is not None and time.perf_counter() >= deadline):
+            break
+
+def lane_text(lane, name):
+    if lane is None:
+        return name.upper()
+    text = f"{name.upper()} - {len(lane['visited'])} visited"
+    if not lane["running"]:
+        text += f" - path {len(lane['path'])}" if lane["path"] else " - no path"
+    return text
+
+def speed_label():
+    if instant_mode:
+        return "instant"
+    steps = SPEEDS[speed_index]
+    label = "max" if steps is None else f"{steps} steps/frame"
+    return label + " in worker" if worker_mode else label
 
 # --- Main Loop ---
 running = True
-algo_start_time = None
-algo_elapsed_time = 0.0
+# Time of the current (or last) run spent consuming search steps, and spent
+# drawing the frames in between
+search_time = 0.0
+render_time = 0.0
+# Report of the run that finished this frame; its render time is completed after drawing
+finished_report = None
 
 # --- History State ---
-# Now each history entry is (algorithm_mode, elapsed_time, path_length)
-history = []  # List of (algorithm_mode, elapsed_time, path_length) tuples, max length 4
+# Now each history entry is (algorithm_mode, search_time, path_length, report), where
+# report holds the scalar entries of the final step ("expanded", "relaxations", "algo_ns", ...)
+# and "render", the time spent drawing while the run was shown
+history = []  # List of (algorithm_mode, search_time, path_length, report) tuples, max length 4
+REPORT_KEYS = ("expanded", "relaxations", "pushes", "stale_pops", "peak_frontier", "algo_ns", "queue")
+
+def run_report(step):
+    return {key: value for key, value in step.items() if key in REPORT_KEYS}
+
+def record_run(algo, t, plen, report):
+    history.append((algo, t, plen, report))
+    if len(history) > 4:
+        history.pop(0)
+    return report
+
+def history_text(idx, algo, t, plen, report):
+    # Search is the time spent consuming steps (including the visualization
+    # events); "Algo" is the time spent in the search itself
+    queue = f" [{report['queue']}]" if "queue" in report else ""
+    text = f"{idx+1}. {algo.upper()}{queue} - Search: {t:.3f} s"
+    if "render" in report:
+        text += f" - Render: {report['render']:.3f} s"
+    text += f" - Len: {plen} - Exp: {report.get('expanded', 0)}"
+    if "relaxations" in report:
+        text += (f" - Relax: {report['relaxations']} - Push: {report['pushes']} - Stale: {report['stale_pops']}"
+                 f" - Peak: {report['peak_frontier']}")
+    if "algo_ns" in report:
+        text += f" - Algo: {report['algo_ns'] / 1e6:.2f} ms"
+    if report.get("cached"):
+        text += " (cached)"
+    return text
 
 while running:
     for event in pygame.event.get():
@@ -228,31 +412,46 @@ while running:
         elif event.type == pygame.MOUSEBUTTONDOWN:
             cell = get_cell_from_pos(event.pos)
             if cell:
-                if event.button == 1 and cell != start and cell != end:
+                if event.button == 1 and pygame.key.get_mods() & pygame.KMOD_SHIFT:
+                    # Shift-click paints terrain; clicking a cell that already
+                    # has the brush cost erases it back to 1
+                    mouse_down = True
+                    same = paintable(cell) and grid.cost_cells[cell[0], cell[1]] == terrain_brush
+                    painting_terrain = MIN_COST if same else terrain_brush
+                    if paintable(cell):
+                        set_terrain(cell, painting_terrain)
+                        grid_edited(cell)
+                elif event.button == 1 and cell != start and cell != end:
                     mouse_down = True
                     drawing_wall = grid[cell[0]][cell[1]] == 0
-                    grid[cell[0]][cell[1]] = 1 if drawing_wall else 0
-                    reset_path_states()
+                    set_wall(cell, 1 if drawing_wall else 0)
+                    grid_edited(cell)
                 elif event.button == 2:
                     if cell != end:
                         start = cell
-                    reset_path_states()
+                    endpoints_moved()
                 elif event.button == 3:  # Middle mouse button for end point
                     if cell != start:
                         end = cell
-                    reset_path_states()
+                    endpoints_moved()
 
         elif event.type == pygame.MOUSEBUTTONUP:
             if event.button == 1:
                 mouse_down = False
                 drawing_wall = None
+                painting_terrain = None
 
         elif event.type == pygame.MOUSEMOTION:
-            if mouse_down and drawing_wall is not None:
+            if mouse_down and painting_terrain is not None:
+                cell = get_cell_from_pos(event.pos)
+                if cell and paintable(cell):
+                    set_terrain(cell, painting_terrain)
+                    grid_edited(cell)
+            elif mouse_down and drawing_wall is not None:
                 cell = get_cell_from_pos(event.pos)
                 if cell and cell != start and cell != end:
-                    grid[cell[0]][cell[1]] = 1 if drawing_wall else 0
-                    reset_path_states()
+                    set_wall(cell, 1 if drawing_wall else 0)
+                    grid_edited(cell)
 
         elif event.type == pygame.KEYDOWN:
             if event.key == pygame.K_1:
@@ -267,98 +466,311 @@ while running:
             elif event.key == pygame.K_4:
                 algorithm_mode = "bfs"
                 reset_path_states()
+            elif event.key == pygame.K_5:
+                algorithm_mode = "jps"
+                reset_path_states()
+            elif event.key == pygame.K_6:
+                algorithm_mode = "dial"
+                reset_path_states()
+            elif event.key == pygame.K_7:
+                algorithm_mode = "field"
+                reset_path_states()
+            elif event.key == pygame.K_8:
+                algorithm_mode = "lpa"
+                reset_path_states()
+            elif event.key == pygame.K_LEFTBRACKET:
+                terrain_brush = max(MIN_COST, terrain_brush - 1)
+            elif event.key == pygame.K_RIGHTBRACKET:
+                terrain_brush = min(MAX_COST, terrain_brush + 1)
+            elif event.key == pygame.K_b:
+                # Toggle between an algorithm and its bidirectional variant
+                if algorithm_mode.startswith("bi-"):
+                    algorithm_mode = algorithm_mode[3:]
+                elif "bi-" + algorithm_mode in STEPWISE:
+                    algorithm_mode = "bi-" + algorithm_mode
+                reset_path_states()
+            elif event.key == pygame.K_q:
+                names = list(QUEUES)
+                queue_mode = names[(names.index(queue_mode) + 1) % len(names)]
+                reset_path_states()
+            elif event.key == pygame.K_SPACE and race_mode:
+                reset_path_states()
+                if not connectivity.connected(start, end):
+                    status_message = "No path: the end is walled off from the start"
+                    continue
+                status_message = ""
+                start_race()
             elif event.key == pygame.K_SPACE:
+                if algorithm_mode not in FULL_SEARCHES and not connectivity.connected(start, end):
+                    # Different components: no point-to-point search can reach the end
+                    reset_path_states()
+                    status_message = "No path: the end is walled off from the start"
+                    record_run(algorithm_mode, 0.0, 0, {"expanded": 0})
+                    continue
+                options = {"queue": queue_mode} if algorithm_mode in QUEUE_ALGORITHMS else {}
+                run_key = (grid_hash.value, start, end, algorithm_mode, options.get("queue"))
+                # Instant mode runs the headless solver for everything but LPA*
+                headless = instant_mode and algorithm_mode in SOLVERS and algorithm_mode != "lpa"
+                # LPA* runs are not cached: the live planner is needed for repairs.
+                # Headless runs have no visited set to cache and are not looked up either.
+                cached = run_cache.get(run_key) if algorithm_mode != "lpa" and not headless else None
+                if cached is not None:
+                    # Show the finished run instantly instead of searching again
+                    reset_path_states()
+                    visited.update(cached["visited"])
+                    path.extend(cached["path"])
+                    heat.update(cached["heat"])
+                    heat_max = cached["heat_max"]
+                    search_time, render_time = cached["search"], 0.0
+                    record_run(algorithm_mode, search_time, len(path), {**cached["report"], "cached": True})
+                    continue
+                if headless:
+                    # No events to fold, only the result is drawn
+                    # (LPA* keeps its stepwise run for the live planner)
+                    t0 = time.perf_counter()
+                    try:
+                        result = SOLVERS[algorithm_mode](start, end, ROWS, COLS, grid, **options)
+                    except ValueError as exc:
+                        status_message = str(exc)
+                        continue
+                    reset_path_states()
+                    status_message = ""
+                    path.extend(result["path"])
+                    search_time, render_time = time.perf_counter() - t0, 0.0
+                    record_run(algorithm_mode, search_time, len(path), {**run_report(result), **options})
+                    continue
+                stop_worker(dijkstra_gen)
+                try:
+                    dijkstra_gen = STEPWISE[algorithm_mode](start, end, rows=ROWS, cols=COLS, grid=grid, **options)
+                except ValueError as exc:
+                    # e.g. JPS on weighted terrain
+                    dijkstra_gen = None
+                    status_message = str(exc)
+                    continue
+                if worker_mode and algorithm_mode != "lpa":
+                    # The worker advances the search; the loop below reads its events
+                    dijkstra_gen = SearchWorker(dijkstra_gen, COLS)
+                status_message = ""
+                planner = None
                 dijkstra_running = True
-                if algorithm_mode == "dijkstra":
-                    dijkstra_gen = dijkstra_stepwise(start, end, rows=ROWS, cols=COLS, grid=grid)
-                elif algorithm_mode == "astar":
-                    dijkstra_gen = astar_stepwise(start, end, rows=ROWS, cols=COLS, grid=grid)
-                elif algorithm_mode == "bfs":
-                    dijkstra_gen = bfs_stepwise(start, end, rows=ROWS, cols=COLS, grid=grid)
-                elif algorithm_mode == "dfs":
-                    dijkstra_gen = dfs_stepwise(start, end, rows=ROWS, cols=COLS, grid=grid)
                 path.clear()
                 visited.clear()
                 frontier.clear()
-                algo_start_time = time.time()
-                algo_elapsed_time = 0.0
+                heat.clear()
+                renderer.mark_all()
+                search_time, render_time = 0.0, 0.0
             elif event.key == pygame.K_TAB:
-                generate_maze_type_3(rows=ROWS, cols=COLS, grid_ref=grid, start_pos=start, end_pos=end)
-                reset_path_states()
+                maze_seed = random.randrange(2 ** 31)
+                if event.mod & pygame.KMOD_SHIFT:
+                    maze_generator = 4
+                    generate_maze_eller(rows=ROWS, cols=COLS, grid_ref=grid, start_pos=start, end_pos=end, seed=maze_seed)
+                else:
+                    maze_generator = 3
+                    generate_maze_type_3(rows=ROWS, cols=COLS, grid_ref=grid, start_pos=start, end_pos=end, seed=maze_seed)
+                grid_replaced()
             elif event.key == pygame.K_BACKQUOTE:  # Nút "`" để xóa hết maze
-                for row in range(ROWS):
-                    for col in range(COLS):
-                        grid[row][col] = 0
+                grid.clear()
+                maze_generator, maze_seed = 0, -1
+                grid_replaced()
+            elif event.key == pygame.K_MINUS:
+                speed_index = max(0, speed_index - 1)
+            elif event.key == pygame.K_EQUALS:
+                speed_index = min(len(SPEEDS) - 1, speed_index + 1)
+            elif event.key == pygame.K_i:
+                instant_mode = not instant_mode
+            elif event.key == pygame.K_r:
+                race_mode = not race_mode
                 reset_path_states()
-
+                needs_repaint = True
+            elif event.key == pygame.K_w:
+                if WORKER_AVAILABLE:
+                    worker_mode = not worker_mode
+                else:
+                    status_message = "Worker mode needs fork(), not available on this platform"
+            elif event.key == pygame.K_f:
+                full_redraw = not full_redraw
+                frame_times.clear()
+                frame_cells.clear()
+            elif event.key == pygame.K_s:
+                save_packed(MAZE_FILE, grid, start, end, maze_generator, maze_seed)
+                status_message = f"Saved {MAZE_FILE}"
+            elif event.key == pygame.K_l:
+                try:
+                    saved = open_packed(MAZE_FILE)
+                    saved.copy_into(grid)
+                except (OSError, ValueError) as exc:
+                    status_message = f"Cannot load {MAZE_FILE}: {exc}"
+                    continue
+                start, end = saved.start, saved.end
+                maze_generator, maze_seed = saved.generator, saved.seed
+                grid_replaced()
+                status_message = f"Loaded {MAZE_FILE}"
+
+    # Frames drawn while a run is in progress count as its render time
+    timing_run = dijkstra_running
     if dijkstra_running and dijkstra_gen:
-        try:
-            step = next(dijkstra_gen)
-            visited.clear()
-            visited.update(step.get("visited", set()))
-            frontier.clear()
-            frontier.update(step.get("frontier", set()))
+        # Consume steps until the speed's count or the frame budget is reached;
+        # instant mode (for runs without a headless solver) drains the search
+        limit = None if instant_mode else SPEEDS[speed_index]
+        t0 = time.perf_counter()
+        deadline = None if instant_mode else t0 + FRAME_BUDGET_MS / 1000
+        steps = 0
+        while dijkstra_running:
+            try:
+                step = next(dijkstra_gen)
+            except RuntimeError as exc:
+                # The worker process failed
+                dijkstra_running = False
+                status_message = str(exc)
+                break
+            except StopIteration:
+                dijkstra_running = False
+                search_time += time.perf_counter() - t0
+                finished_report = record_run(algorithm_mode, search_time, len(path), {"expanded": len(visited)})
+                break
+            if step is None:
+                # The worker has not sent more events yet
+                search_time += time.perf_counter() - t0
+                break
+            # Generators yield deltas; fold them into the live sets
+            apply_step(step, visited, frontier)
+            renderer.mark_step(step)
+            if "wavefront" in step:
+                heat_max = step["level"]
+                for cell in step["wavefront"]:
+                    heat[cell] = heat_max
             if "path" in step:
                 path.clear()
                 path.extend(step["path"])
+                renderer.mark_path()
                 dijkstra_running = False
-                if algo_start_time is not None:
-                    algo_elapsed_time = time.time() - algo_start_time
-                    # --- Update history ---
-                    path_length = len(path) if path else 0
-                    history.append((algorithm_mode, algo_elapsed_time, path_length))
-                    if len(history) > 4:
-                        history.pop(0)
-        except StopIteration:
-            dijkstra_running = False
-            if algo_start_time is not None and algo_elapsed_time == 0.0:
-                algo_elapsed_time = time.time() - algo_start_time
+                search_time += time.perf_counter() - t0
                 # --- Update history ---
-                path_length = len(path) if path else 0
-                history.append((algorithm_mode, algo_elapsed_time, path_length))
-                if len(history) > 4:
-                    history.pop(0)
-
-    # Draw current algorithm mode on the screen
-    font = pygame.font.SysFont(None, 28)
-    mode_text = f"Algorithm: {algorithm_mode.upper()} (1:Dijkstra | 2:A* | 3:DFS | 4:BFS | TAB: Maze | `: Clear)"
-    text_surface = font.render(mode_text, True, (0, 0, 0))
-
-    screen.fill("black")
-    draw_grid()
-    screen.blit(text_surface, (20, 20))
-
-    # Draw stopwatch (elapsed time) and history at bottom left, stacked vertically (Elapsed above, history below, but history is horizontal)
-    font_time = pygame.font.SysFont(None, 28)
-    font_hist = pygame.font.SysFont(None, 24)
+                report = run_report(step)
+                finished_report = record_run(algorithm_mode, search_time, len(path), report)
+                if "planner" in step:
+                    planner = step["planner"]
+                else:
+                    run_cache.put(run_key, {
+                        "visited": set(visited),
+                        "path": list(path),
+                        "heat": dict(heat),
+                        "heat_max": heat_max,
+                        "search": search_time,
+                        "report": dict(report),
+                    })
+                break
+            steps += 1
+            if steps == limit or (deadline is not None and time.perf_counter() >= deadline):
+                search_time += time.perf_counter() - t0
+                break
+
+    if race_run is not None and not race_run.done:
+        race_run.poll()
+    if race_lanes:
+        # Lanes advance at the same speed and share the frame budget
+        limit = None if instant_mode else SPEEDS[speed_index]
+        for lane in race_lanes:
+            deadline = None if instant_mode else time.perf_counter() + FRAME_BUDGET_MS / 1000 / len(race_lanes)
+            advance_lane(lane, limit, deadline)
+
+    # --- Draw ---
+    t_frame = time.perf_counter()
+    # The first frame, a layout change and every frame in full-redraw mode paint the whole window
+    repaint = full_redraw or needs_repaint
+    needs_repaint = False
+    if repaint:
+        screen.fill(COLOR_BG)
+        renderer.invalidate()
+        for view in race_views:
+            view.invalidate()
+        drawn_panels.clear()
+    if full_redraw:
+        font_large, font_small = pygame.font.SysFont(None, 28), pygame.font.SysFont(None, 24)
+    else:
+        font_large, font_small = FONT_LARGE, FONT_SMALL
+    if race_mode:
+        dirty_rects = []
+        for i, (view, name) in enumerate(zip(race_views, RACE_ALGORITHMS)):
+            lane = race_lanes[i] if race_lanes else None
+            if lane is None:
+                dirty_rects += view.draw(grid, start, end, [], set(), set())
+            else:
+                dirty_rects += view.draw(grid, start, end, lane["path"], lane["visited"], lane["frontier"])
+            label_rect = RACE_LABEL_PANELS[i]
+            dirty_rects += draw_panel(label_rect, ((font_small, lane_text(lane, name), (0, 0, 0), (label_rect.x, label_rect.y + 4)),))
+        # Leaderboard under the viewports, fastest first
+        board = [(font_large, f"Leaderboard [{queue_mode}] - solver time only, fastest of {RACE_REPEATS} runs, run in parallel",
+                  (0, 0, 0), (20, RACE_BOARD_PANEL.y))]
+        y = RACE_BOARD_PANEL.y + font_large.get_height() + 8
+        leaderboard = race_run.leaderboard() if race_run is not None else []
+        for rank, row in enumerate(leaderboard):
+            cost = "-" if row["cost"] is None else row["cost"]
+            board.append((font_small, f"{rank+1}. {row['algorithm'].upper()} - {row['time_ms']:.3f} ms - "
+                                      f"Exp: {row['expanded']} - Len: {row['path_length']} - Cost: {cost}",
+                          (0, 0, 0), (20, y)))
+            y += font_small.get_height() + 2
+        for name, error in (race_run.failed.items() if race_run is not None else ()):
+            board.append((font_small, f"{name.upper()} - failed: {error}", (160, 0, 0), (20, y)))
+            y += font_small.get_height() + 2
+        if race_run is not None and not race_run.done:
+            racing = " | ".join(name.upper() for name in race_run.pending)
+            board.append((font_small, f"Running: {racing}", (0, 0, 120), (20, y)))
+        dirty_rects += draw_panel(RACE_BOARD_PANEL, tuple(board))
+    else:
+        dirty_rects = renderer.draw(grid, start, end, path, visited, frontier, heat, heat_max, live=dijkstra_running)
+
+    # Current algorithm mode and terrain brush at the top
+    queue_label = f" [{queue_mode}]" if algorithm_mode in QUEUE_ALGORITHMS else ""
+    mode_text = f"Algorithm: {algorithm_mode.upper()}{queue_label} (1:Dijkstra | 2:A* | 3:DFS | 4:BFS | 5:JPS | 6:Dial | 7:Field | 8:LPA* | B: Bidirectional | Q: Queue | TAB: Maze | `: Clear)"
+    if race_mode:
+        mode_text = f"Race: {' | '.join(name.upper() for name in RACE_ALGORITHMS)} (SPACE: Start | R: Leave race mode | Q: Queue | TAB: Maze | `: Clear)"
+    brush_text = f"Terrain brush: {terrain_brush} (Shift+drag to paint | [ / ] to change)"
+    if status_message:
+        brush_text += f" - {status_message}"
+    line_height = font_large.get_height() + 4
+    dirty_rects += draw_panel(TOP_PANEL, (
+        (font_large, mode_text, (0, 0, 0), (20, 20)),
+        (font_large, brush_text, (160, 0, 0) if status_message else (0, 0, 0), (20, 20 + line_height)),
+    ))
+
+    # Frame-time overlay, refreshed a few times per second so it stays readable
+    if frame_times and (frame_count % 15 == 0 or full_redraw):
+        frame_text = (f"Render: {sum(frame_times) / len(frame_times):.2f} ms/frame (max {max(frame_times):.2f}), "
+                      f"{sum(frame_cells) / len(frame_cells):.0f} cells/frame "
+                      f"({'full redraw' if full_redraw else 'layered'}, F: toggle)")
+    dirty_rects += draw_panel(OVERLAY_PANEL, ((font_small, frame_text, (0, 0, 120), (20, OVERLAY_PANEL.y)),))
+
+    # Stopwatch (elapsed time) and history at bottom left, stacked vertically (Elapsed above, one history entry per line below)
     padding = 20
     spacing = 8
-
-    # Calculate y position for bottom
-    time_surface = font_time.render("Elapsed: 0.000 s", True, (0, 0, 0))
-    hist_height = font_hist.get_height()
-    bottom_y = HEIGHT - padding - time_surface.get_height() - (hist_height if history else 0) - (spacing if history else 0)
-
-    # Draw stopwatch
-    if dijkstra_running and algo_start_time is not None:
-        elapsed = time.time() - algo_start_time
+    hist_height = font_small.get_height()
+    bottom_y = HEIGHT - padding - font_large.get_height() - hist_height * len(history) - (spacing if history else 0)
+    time_text = (f"Search: {search_time:.3f} s - Render: {render_time:.3f} s - Speed: {speed_label()} "
+                 f"(-/= speed, I: instant) - Cache hits: {run_cache.hits} misses: {run_cache.misses}")
+    bottom = [(font_large, time_text, (0, 0, 0), (padding, bottom_y))]
+    # History below the stopwatch, newest first
+    y = bottom_y + font_large.get_height() + spacing
+    for idx, (algo, t, plen, report) in enumerate(reversed(history)):
+        bottom.append((font_small, history_text(idx, algo, t, plen, report), (0, 0, 0), (padding, y)))
+        y += hist_height
+    dirty_rects += draw_panel(BOTTOM_PANEL, tuple(bottom))
+
+    if repaint:
+        pygame.display.flip()
     else:
-        elapsed = algo_elapsed_time
-    time_text = f"Elapsed: {elapsed:.3f} s"
-    time_surface = font_time.render(time_text, True, (0, 0, 0))
-    screen.blit(time_surface, (padding, bottom_y))
-
-    # Draw history horizontally below stopwatch if exists
-    if history:
-        y = bottom_y + time_surface.get_height() + spacing
-        x = padding
-        for idx, (algo, t, plen) in enumerate(reversed(history)):
-            hist_text = f"{idx+1}. {algo.upper()} - {t:.3f} s - Len: {plen}"
-            hist_surface = font_hist.render(hist_text, True, (0, 0, 0))
-            screen.blit(hist_surface, (x, y))
-            x += hist_surface.get_width() + 16  # horizontal spacing between history items
-
-    pygame.display.flip()
+        pygame.display.update(dirty_rects)
+    frame_ms = 1000 * (time.perf_counter() - t_frame)
+    frame_times.append(frame_ms)
+    frame_cells.append(sum(view.drawn_cells for view in race_views) if race_mode else renderer.drawn_cells)
+    if timing_run:
+        render_time += frame_ms / 1000
+    if finished_report is not None:
+        # The run's last frame has been drawn
+        finished_report["render"] = render_time
+        finished_report = None
+    frame_count += 1
     clock.tick(60)
 
+reset_path_states()
 pygame.quit()
@@ -0,0 +1,116 @@
+"""
+Headless batch runner: every solver on every maze generator, in parallel.
+
+Usage:
+    python batch_runner.py [--sizes 21 41 81] [--mazes 3] [--seed 0]
+                           [--workers N] [--out results.csv]
+
+For each maze type (1-3 in maze_generators.py), size and seed a maze is
+generated and solved from the top-left to the bottom-right corner with every
+solver in algorithms.SOLVERS and with HPA* (hpa.solve_hpa). Mazes are spread
+over a process pool; each row of the CSV holds one (maze, solver) run with its
+runtime, the solver's search counters (cells expanded, relaxations, pushes,
+stale pops, peak frontier), path length and cost.
+A summary of median runtimes per size and the fitted growth of runtime with
+the number of cells is printed at the end.
+"""
+import argparse
+import csv
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from algorithms import SOLVERS
+from grid_graph import GridGraph
+from hpa import solve_hpa
+from maze_generators import generate_maze_type_1, generate_maze_type_2, generate_maze_type_3
+
+GENERATORS = {
+    1: generate_maze_type_1,
+    2: generate_maze_type_2,
+    3: generate_maze_type_3,
+}
+
+# Every solver, keyed by the name written to the CSV
+ALGORITHMS = {**SOLVERS, "hpa": solve_hpa}
+
+FIELDS = [
+    "maze_type", "rows", "cols", "seed", "algorithm", "time_ms",
+    "expanded", "relaxations", "pushes", "stale_pops", "peak_frontier", "path_length", "cost",
+]
+
+def run_maze(task):
+    """Generate one maze and solve it with every solver; returns a list of CSV rows."""
+    maze_type, size, seed = task
+    graph = GridGraph(size, size)
+    start, end = (0, 0), (size - 1, size - 1)
+    GENERATORS[maze_type](size, size, graph, start, end, seed=seed)
+    rows = []
+    for name, solver in ALGORITHMS.items():
+        result = solver(start, end, size, size, graph)
+        rows.append({
+            "maze_type": maze_type,
+            "rows": size,
+            "cols": size,
+            "seed": seed,
+            "algorithm": name,
+            "time_ms": round(result["algo_ns"] / 1e6, 4),
+            "expanded": result["expanded"],
+            "relaxations": result["relaxations"],
+            "pushes": result["pushes"],
+            "stale_pops": result["stale_pops"],
+            "peak_frontier": result["peak_frontier"],
+            "path_length": len(result["path"]),
+            "cost": "" if result["cost"] is None else result["cost"],
+        })
+    return rows
+
+def summarize(rows):
+    """Print median runtime per algorithm and size, and the exponent k of time ~ cells**k."""
+    sizes = sorted({row["rows"] for row in rows})
+    print(f"{'algorithm':>12} " + " ".join(f"{f'{s}x{s} (ms)':>13}" for s in sizes) + f" {'expanded':>9} {'growth':>7}")
+    for name in ALGORITHMS:
+        medians = []
+        for size in sizes:
+            times = [row["time_ms"] for row in rows if row["algorithm"] == name and row["rows"] == size]
+            medians.append(statistics.median(times))
+        expanded = statistics.mean(row["expanded"] for row in rows if row["algorithm"] == name and row["rows"] == sizes[-1])
+        growth = ""
+        if len(sizes) > 1 and min(medians) > 0:
+            k = np.polyfit(np.log([s * s for s in sizes]), np.log(medians), 1)[0]
+            growth = f"n^{k:.2f}"
+        print(f"{name:>12} " + " ".join(f"{m:>13.3f}" for m in medians) + f" {expanded:>9.0f} {growth:>7}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve generated mazes with every solver on a process pool.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[21, 41, 81])
+    parser.add_argument("--mazes", type=int, default=3, help="mazes per generator and size")
+    parser.add_argument("--types", type=int, nargs="+", default=list(GENERATORS), choices=list(GENERATORS))
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first maze; later mazes count up")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--out", default="results.csv")
+    args = parser.parse_args()
+
+    tasks = [
+        (maze_type, size, args.seed + i)
+        for maze_type in args.types
+        for size in args.sizes
+        for i in range(args.mazes)
+    ]
+    rows = []
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for maze_rows in pool.map(run_maze, tasks):
+            rows.extend(maze_rows)
+    with open(args.out, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"{len(tasks)} mazes, {len(rows)} runs in {time.perf_counter() - t0:.1f} s -> {args.out}")
+    summarize(rows)
+
+if __name__ == "__main__":
+    main()
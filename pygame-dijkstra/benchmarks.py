@@ -0,0 +1,369 @@
+"""
+Headless benchmarks for the path-finding solvers.
+
+Usage:
+    python benchmarks.py dial [--sizes 100 300 1000] [--repeat 3] [--seed 0]
+    python benchmarks.py queues [--sizes 100 300 1000] [--repeat 3] [--seed 0]
+    python benchmarks.py lpa [--sizes 100 300] [--edits 50] [--seed 0]
+    python benchmarks.py hpa [--sizes 256 512 1024] [--cluster 16] [--queries 5] [--seed 0]
+    python benchmarks.py eller [--sizes 500 1000 2000] [--seed 0]
+    python benchmarks.py suite [--sizes 30x45 100x100 300x300 1000x1000] [--repeat 3] [--seed 0] [--out bench.json]
+    python benchmarks.py compare baseline.json bench.json [--threshold 10]
+
+Subcommands:
+    dial: Dial's bucket-queue Dijkstra (solve_dial) against the heapq version
+          (solve_dijkstra) on random weighted terrain.
+    queues: solve_dijkstra and solve_astar with every priority queue type,
+            reporting time and peak queue size.
+    lpa: LPAStar repair after single-cell edits against a full astar_stepwise
+         rerun (and solve_astar) on the edited grid.
+    hpa: HPAStar preprocessing, query latency, path quality, relaxations and
+         rebuild time after an edit, against astar_stepwise and solve_astar.
+    eller: Eller's row-streaming generator against generate_maze_type_3, into
+           a grid and streamed straight to a .maze file, with time and
+           tracemalloc peak memory.
+    suite: Every *_stepwise generator run to completion on a seeded type 3
+           maze, and every generate_maze_type_* function, at fixed sizes.
+           Records best-of-repeat time and tracemalloc peak memory as JSON.
+    compare: Compare two suite JSON files and exit with status 1 if any case
+             got slower or used more memory by more than --threshold percent.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from algorithms import STEPWISE, LPAStar, astar_stepwise, solve_astar, solve_dial, solve_dijkstra
+from connectivity import ConnectivityIndex
+from grid_graph import GridGraph, MAX_COST
+from hpa import HPAStar
+from maze_io import save_packed_rows
+from maze_generators import eller_rows, generate_maze_eller, generate_maze_type_1, generate_maze_type_2, generate_maze_type_3
+from priority_queues import QUEUES
+
+def random_terrain(rows, cols, seed, wall_prob=0.2, max_cost=MAX_COST):
+    """
+    Random grid with walls and terrain costs; start and end corners are open.
+    Params:
+        rows (int): Number of rows in the grid.
+        cols (int): Number of columns in the grid.
+        seed (int): Seed for the NumPy random generator.
+        wall_prob (float): Probability that a cell is a wall.
+        max_cost (int): Largest terrain cost (costs are uniform in 1..max_cost).
+    """
+    rng = np.random.default_rng(seed)
+    graph = GridGraph(rows, cols)
+    graph.cells[:] = rng.random((rows, cols)) < wall_prob
+    graph.cost_cells[:] = rng.integers(1, max_cost + 1, size=(rows, cols))
+    graph.cells[0, 0] = 0
+    graph.cells[rows - 1, cols - 1] = 0
+    return graph
+
+def time_solver(solver, graph, start, end, repeat, **options):
+    """Best-of-repeat wall time in seconds and the last result."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = solver(start, end, graph.rows, graph.cols, graph, **options)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+def bench_dial(args):
+    print(f"{'size':>11} {'heapq (s)':>10} {'dial (s)':>10} {'speedup':>8} {'cost':>8}")
+    for size in args.sizes:
+        graph = random_terrain(size, size, args.seed)
+        start, end = (0, 0), (size - 1, size - 1)
+        t_heap, r_heap = time_solver(solve_dijkstra, graph, start, end, args.repeat)
+        t_dial, r_dial = time_solver(solve_dial, graph, start, end, args.repeat)
+        if r_heap["cost"] != r_dial["cost"]:
+            raise AssertionError(f"cost mismatch at {size}: {r_heap['cost']} != {r_dial['cost']}")
+        print(f"{size:>5}x{size:<5} {t_heap:>10.3f} {t_dial:>10.3f} {t_heap / t_dial:>7.2f}x {str(r_dial['cost']):>8}")
+
+def bench_queues(args):
+    print(f"{'size':>11} {'solver':>8} {'queue':>8} {'time (s)':>9} {'peak':>8} {'cost':>8}")
+    for size in args.sizes:
+        graph = random_terrain(size, size, args.seed)
+        start, end = (0, 0), (size - 1, size - 1)
+        for name, solver in (("dijkstra", solve_dijkstra), ("astar", solve_astar)):
+            costs = set()
+            for queue in QUEUES:
+                elapsed, result = time_solver(solver, graph, start, end, args.repeat, queue=queue)
+                costs.add(result["cost"])
+                print(f"{size:>5}x{size:<5} {name:>8} {queue:>8} {elapsed:>9.3f} {result['peak_queue']:>8} {str(result['cost']):>8}")
+            if len(costs) != 1:
+                raise AssertionError(f"{name} costs differ between queues at {size}: {costs}")
+
+def bench_lpa(args):
+    # Each edit toggles the wall of one random cell near the current path, where
+    # a change is most likely to matter, then compares repair and full replan.
+    print(f"{'size':>11} {'edits':>6} {'repair (ms)':>12} {'astar_stepwise (ms)':>20} {'solve_astar (ms)':>17} {'speedup':>8} {'repaired':>9} {'astar exp':>10}")
+    for size in args.sizes:
+        graph = random_terrain(size, size, args.seed)
+        start, end = (0, 0), (size - 1, size - 1)
+        rng = random.Random(args.seed)
+        planner = LPAStar(graph, start, end)
+        path = planner.replan()["path"]
+        t_repair = t_step = t_solve = 0.0
+        repaired = astar_expanded = n = 0
+        for _ in range(args.edits):
+            if path:
+                r, c = path[rng.randrange(1, len(path))]
+                cell = (min(size - 1, max(0, r + rng.randint(-2, 2))), min(size - 1, max(0, c + rng.randint(-2, 2))))
+            else:
+                cell = (rng.randrange(size), rng.randrange(size))
+            if cell in (start, end):
+                continue
+            graph.cells[cell] ^= 1
+            n += 1
+
+            t0 = time.perf_counter()
+            planner.cell_changed(cell)
+            step = planner.replan()
+            t_repair += time.perf_counter() - t0
+            repaired += step["expanded"]
+            path = step["path"]
+
+            t0 = time.perf_counter()
+            for full in astar_stepwise(start, end, size, size, graph):
+                pass
+            t_step += time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            result = solve_astar(start, end, size, size, graph)
+            t_solve += time.perf_counter() - t0
+            astar_expanded += result["expanded"]
+            if step["cost"] != result["cost"]:
+                raise AssertionError(f"cost mismatch at {size} after editing {cell}: {step['cost']} != {result['cost']}")
+        n = max(n, 1)
+        print(f"{size:>5}x{size:<5} {n:>6} {1000 * t_repair / n:>12.3f} {1000 * t_step / n:>20.3f} {1000 * t_solve / n:>17.3f} "
+              f"{t_step / t_repair:>7.1f}x {repaired // n:>9} {astar_expanded // n:>10}")
+
+def bench_hpa(args):
+    # Queries join random open cells in the same component, so every search succeeds
+    print(f"{'size':>11} {'build (s)':>10} {'precompute (s)':>15} {'hpa (ms)':>9} {'astar_stepwise (ms)':>20} "
+          f"{'solve_astar (ms)':>17} {'cost ratio':>11} {'hpa relax':>10} {'astar relax':>12} {'rebuild (ms)':>13}")
+    for size in args.sizes:
+        graph = random_terrain(size, size, args.seed)
+        rng = random.Random(args.seed)
+        index = ConnectivityIndex(graph)
+        open_cells = list(zip(*np.nonzero(graph.cells == 0)))
+        pairs = []
+        while len(pairs) < args.queries:
+            a, b = (tuple(map(int, rng.choice(open_cells))) for _ in range(2))
+            if index.connected(a, b):
+                pairs.append((a, b))
+
+        t0 = time.perf_counter()
+        hpa = HPAStar(graph, args.cluster)
+        t_build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        hpa.precompute()
+        t_pre = time.perf_counter() - t0
+
+        t_hpa = t_step = t_solve = 0.0
+        ratio = 0.0
+        hpa_relax = astar_relax = 0
+        for a, b in pairs:
+            result = hpa.query(a, b)
+            t_hpa += result["algo_ns"] / 1e9
+            hpa_relax += result["relaxations"]
+            t0 = time.perf_counter()
+            for step in astar_stepwise(a, b, size, size, graph):
+                pass
+            t_step += time.perf_counter() - t0
+            t0 = time.perf_counter()
+            best = solve_astar(a, b, size, size, graph)
+            t_solve += time.perf_counter() - t0
+            astar_relax += best["relaxations"]
+            ratio += result["cost"] / max(best["cost"], 1)
+
+        # Toggle one wall per query pair and time the local rebuild
+        t_rebuild = 0.0
+        for _ in range(args.queries):
+            cell = (rng.randrange(size), rng.randrange(size))
+            graph.cells[cell] ^= 1
+            t0 = time.perf_counter()
+            hpa.cells_changed([cell])
+            t_rebuild += time.perf_counter() - t0
+
+        n = args.queries
+        print(f"{size:>5}x{size:<5} {t_build:>10.3f} {t_pre:>15.3f} {1000 * t_hpa / n:>9.2f} {1000 * t_step / n:>20.2f} "
+              f"{1000 * t_solve / n:>17.2f} {ratio / n:>11.3f} {hpa_relax // n:>10} {astar_relax // n:>12} "
+              f"{1000 * t_rebuild / n:>13.2f}")
+
+SUITE_GENERATORS = {
+    "type_1": generate_maze_type_1,
+    "type_2": generate_maze_type_2,
+    "type_3": generate_maze_type_3,
+    "eller": generate_maze_eller,
+}
+
+def parse_size(text):
+    """Parse "ROWSxCOLS" (or a single number for a square grid)."""
+    rows, _, cols = text.lower().partition("x")
+    return int(rows), int(cols or rows)
+
+def measure(fn, repeat, min_time=0.5):
+    """
+    Best wall time in seconds over at least repeat runs, adding runs until
+    min_time has passed so millisecond cases are not dominated by noise,
+    then the peak traced memory in bytes of one more run.
+    """
+    best = float('inf')
+    runs = 0
+    total = 0.0
+    while runs < repeat or total < min_time:
+        t0 = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - t0
+        best = min(best, elapsed)
+        total += elapsed
+        runs += 1
+    # A separate run: tracing slows the code down and would skew the timing
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+def bench_eller(args):
+    print(f"{'size':>11} {'generator':>14} {'time (s)':>9} {'peak (MiB)':>11}")
+    for size in args.sizes:
+        start, end = (0, 0), (size - 1, size - 1)
+        graph = GridGraph(size, size)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "eller.maze")
+            cases = (
+                ("type_3", lambda: generate_maze_type_3(size, size, graph, start, end, seed=args.seed)),
+                ("eller", lambda: generate_maze_eller(size, size, graph, start, end, seed=args.seed)),
+                ("eller -> file", lambda: save_packed_rows(path, size, size, start, end,
+                                                           eller_rows(size, size, start, end, seed=args.seed), 4, args.seed)),
+            )
+            for name, fn in cases:
+                seconds, peak = measure(fn, 1, min_time=0)
+                print(f"{size:>5}x{size:<5} {name:>14} {seconds:>9.3f} {peak / 2 ** 20:>11.2f}", flush=True)
+
+def bench_suite(args):
+    results = {}
+
+    def record(key, fn):
+        seconds, peak = measure(fn, args.repeat, args.min_time)
+        results[key] = {"time_s": seconds, "peak_bytes": peak}
+        print(f"{key:<32} {1000 * seconds:>11.3f} ms {peak / 1024:>11.1f} KiB", flush=True)
+
+    for text in args.sizes:
+        rows, cols = parse_size(text)
+        start, end = (0, 0), (rows - 1, cols - 1)
+        graph = GridGraph(rows, cols)
+        for name, generate in SUITE_GENERATORS.items():
+            def run_generator(generate=generate):
+                random.seed(args.seed)
+                generate(rows, cols, graph, start, end)
+            record(f"generate/{name}/{rows}x{cols}", run_generator)
+
+        random.seed(args.seed)
+        generate_maze_type_3(rows, cols, graph, start, end)
+        for name, stepwise in STEPWISE.items():
+            def run_search(stepwise=stepwise):
+                for step in stepwise(start, end, rows, cols, graph):
+                    pass
+            record(f"search/{name}/{rows}x{cols}", run_search)
+
+    meta = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "repeat": args.repeat,
+        "min_time": args.min_time,
+        "seed": args.seed,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    with open(args.out, "w") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2)
+    print(f"wrote {len(results)} cases to {args.out}")
+
+def bench_compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    with open(args.current) as f:
+        current = json.load(f)["results"]
+    regressions = 0
+    print(f"{'case':<32} {'time':>9} {'memory':>9}")
+    for key in baseline:
+        if key not in current:
+            print(f"{key:<32} {'missing':>9}")
+            continue
+        old, new = baseline[key], current[key]
+        time_change = 100 * (new["time_s"] / max(old["time_s"], 1e-9) - 1)
+        mem_change = 100 * (new["peak_bytes"] / max(old["peak_bytes"], 1) - 1)
+        flags = [label for label, change in (("time", time_change), ("memory", mem_change)) if change > args.threshold]
+        regressions += bool(flags)
+        note = f"  REGRESSION ({', '.join(flags)})" if flags else ""
+        print(f"{key:<32} {time_change:>+8.1f}% {mem_change:>+8.1f}%{note}")
+    for key in current.keys() - baseline.keys():
+        print(f"{key:<32} {'new':>9}")
+    print(f"{regressions} regression(s) beyond {args.threshold:g}%")
+    if regressions:
+        sys.exit(1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for the headless path-finding solvers.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    dial = sub.add_parser("dial", help="Dial's bucket queue vs heapq Dijkstra on weighted terrain")
+    dial.add_argument("--sizes", type=int, nargs="+", default=[100, 300, 1000])
+    dial.add_argument("--repeat", type=int, default=3)
+    dial.add_argument("--seed", type=int, default=0)
+    dial.set_defaults(func=bench_dial)
+
+    queues = sub.add_parser("queues", help="time and peak size of each priority queue type")
+    queues.add_argument("--sizes", type=int, nargs="+", default=[100, 300, 1000])
+    queues.add_argument("--repeat", type=int, default=3)
+    queues.add_argument("--seed", type=int, default=0)
+    queues.set_defaults(func=bench_queues)
+
+    lpa = sub.add_parser("lpa", help="LPA* repair time vs a full A* rerun after wall edits")
+    lpa.add_argument("--sizes", type=int, nargs="+", default=[100, 300])
+    lpa.add_argument("--edits", type=int, default=50)
+    lpa.add_argument("--seed", type=int, default=0)
+    lpa.set_defaults(func=bench_lpa)
+
+    hpa = sub.add_parser("hpa", help="hierarchical HPA* queries vs flat A*")
+    hpa.add_argument("--sizes", type=int, nargs="+", default=[256, 512, 1024])
+    hpa.add_argument("--cluster", type=int, default=16)
+    hpa.add_argument("--queries", type=int, default=5)
+    hpa.add_argument("--seed", type=int, default=0)
+    hpa.set_defaults(func=bench_hpa)
+
+    eller = sub.add_parser("eller", help="Eller's streaming generator vs maze type 3 at large sizes")
+    eller.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 2000])
+    eller.add_argument("--seed", type=int, default=0)
+    eller.set_defaults(func=bench_eller)
+
+    suite = sub.add_parser("suite", help="time and peak memory of every stepwise search and maze generator, saved as JSON")
+    suite.add_argument("--sizes", nargs="+", default=["30x45", "100x100", "300x300", "1000x1000"])
+    suite.add_argument("--repeat", type=int, default=3)
+    suite.add_argument("--seed", type=int, default=0)
+    suite.add_argument("--min-time", type=float, default=0.5, help="keep repeating a case until this many seconds have passed")
+    suite.add_argument("--out", default="bench.json")
+    suite.set_defaults(func=bench_suite)
+
+    compare = sub.add_parser("compare", help="flag regressions of a suite run against a baseline")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=10.0, help="allowed slowdown or memory growth in percent")
+    compare.set_defaults(func=bench_compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
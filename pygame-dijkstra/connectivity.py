@@ -0,0 +1,92 @@
+"""
+Connected-component index of the open cells of a grid.
+
+ConnectivityIndex answers "can start reach end at all?" in near O(1), so the
+app can report an unreachable end without flooding the start's whole region.
+Removing a wall is folded in incrementally with union-find; adding a wall may
+split a component, which union-find cannot undo, so the index is marked stale
+and rebuilt on the next query.
+"""
+import numpy as np
+
+from grid_graph import OPEN, as_grid_graph
+
+class ConnectivityIndex:
+    """
+    Union-find over the open cells of a grid (4-connected).
+    The build labels each horizontal run of open cells with NumPy and only
+    unions runs that touch vertically, so the Python loop runs over run pairs
+    rather than cells.
+    Params:
+        grid (GridGraph or list of list): Grid to index. A GridGraph is read
+            again on every rebuild, so later edits are seen once reported.
+    """
+
+    def __init__(self, grid):
+        self.graph = as_grid_graph(grid)
+        self.rebuilds = 0
+        self.rebuild()
+
+    def rebuild(self):
+        graph = self.graph
+        stride = graph.stride
+        flat = (graph.padded == OPEN).ravel()
+        # Runs never wrap across rows: the padding columns are walls
+        run_start = flat.copy()
+        run_start[1:] &= ~flat[:-1]
+        runs = np.cumsum(run_start) - 1
+        n_runs = int(runs[-1]) + 1 if flat.any() else 0
+        labels = np.where(flat, runs, -1)
+
+        above, below = labels[:-stride], labels[stride:]
+        touching = (above >= 0) & (below >= 0)
+        pairs = np.unique(above[touching].astype(np.int64) * n_runs + below[touching])
+        parent = list(range(n_runs))
+        self._parent = parent
+        for a, b in zip((pairs // max(n_runs, 1)).tolist(), (pairs % max(n_runs, 1)).tolist()):
+            self._union(a, b)
+        roots = np.array([self._find(i) for i in range(n_runs)], dtype=np.int64)
+        self._parent = roots.tolist()
+        self._labels = np.where(flat, roots[np.maximum(labels, 0)] if n_runs else -1, -1).tolist()
+        self._stale = False
+        self.rebuilds += 1
+
+    def _find(self, i):
+        parent = self._parent
+        while parent[i] != i:
+            # Path halving
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def _union(self, a, b):
+        ra, rb = self._find(a), self._find(b)
+        if ra != rb:
+            if ra < rb:
+                ra, rb = rb, ra
+            self._parent[ra] = rb
+
+    def wall_removed(self, cell):
+        """Join the newly opened cell with its open neighbours."""
+        if self._stale:
+            return
+        i = self.graph.index(cell)
+        labels = self._labels
+        new = len(self._parent)
+        self._parent.append(new)
+        labels[i] = new
+        for off in self.graph.offsets:
+            if labels[i + off] >= 0:
+                self._union(new, labels[i + off])
+
+    def wall_added(self, cell):
+        """A new wall may split a component; rebuild on the next query."""
+        self._stale = True
+
+    def connected(self, a, b):
+        """True if cells a and b are both open and in the same component."""
+        if self._stale:
+            self.rebuild()
+        la = self._labels[self.graph.index(a)]
+        lb = self._labels[self.graph.index(b)]
+        return la >= 0 and lb >= 0 and self._find(la) == self._find(lb)
@@ -0,0 +1,89 @@
+import numpy as np
+
+OPEN = 0
+WALL = 1
+# Traversal cost of entering an open cell; terrain ranges from 1 to MAX_COST
+MIN_COST = 1
+MAX_COST = 9
+
+class GridGraph:
+    """
+    Grid of cells backed by a contiguous uint8 NumPy array (0 = open, 1 = wall).
+    The array is padded with a one-cell wall border, so the four neighbours of
+    any interior flat index can be read without bounds checks.
+    A second uint8 array of the same shape holds terrain costs: moving into a
+    cell costs its value (1 to 9, default 1).
+    Indexing keeps the list-of-lists interface: grid[row][col] reads and writes
+    the interior cells.
+    Params:
+        rows (int): Number of rows in the grid.
+        cols (int): Number of columns in the grid.
+    """
+
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        # Row length of the padded array; flat index = (row + 1) * stride + col + 1
+        self.stride = cols + 2
+        self.padded = np.full((rows + 2, cols + 2), WALL, dtype=np.uint8)
+        self.padded[1:-1, 1:-1] = OPEN
+        # View of the interior cells (no copy)
+        self.cells = self.padded[1:-1, 1:-1]
+        self.costs = np.full((rows + 2, cols + 2), MIN_COST, dtype=np.uint8)
+        self.cost_cells = self.costs[1:-1, 1:-1]
+        # Flat index offsets in the same order as algorithms.DIRECTIONS
+        self.offsets = (-self.stride, self.stride, -1, 1)
+
+    @classmethod
+    def from_lists(cls, grid):
+        rows = len(grid)
+        cols = len(grid[0]) if rows else 0
+        graph = cls(rows, cols)
+        if rows and cols:
+            graph.cells[:] = np.asarray(grid, dtype=np.uint8)
+        return graph
+
+    def __getitem__(self, row):
+        return self.cells[row]
+
+    def __len__(self):
+        return self.rows
+
+    def index(self, cell):
+        return (cell[0] + 1) * self.stride + cell[1] + 1
+
+    def cell(self, index):
+        r, c = divmod(index, self.stride)
+        return (r - 1, c - 1)
+
+    def passable(self):
+        """Flat bytes over the padded grid, 1 where a cell can be entered."""
+        return (self.padded == OPEN).tobytes()
+
+    def weights(self):
+        """Flat bytes over the padded grid holding the cost of entering each cell."""
+        return self.costs.tobytes()
+
+    def set_cost(self, cell, cost):
+        self.cost_cells[cell[0], cell[1]] = min(max(cost, MIN_COST), MAX_COST)
+
+    def max_cost(self):
+        """Largest terrain cost among the open cells."""
+        open_costs = self.cost_cells[self.cells == OPEN]
+        return int(open_costs.max()) if open_costs.size else MIN_COST
+
+    def is_uniform(self):
+        return self.max_cost() == MIN_COST
+
+    def clear(self):
+        self.cells.fill(OPEN)
+        self.cost_cells.fill(MIN_COST)
+
+    def to_lists(self):
+        return self.cells.tolist()
+
+def as_grid_graph(grid):
+    """Return grid unchanged if it is a GridGraph, otherwise wrap a copy of a list of lists."""
+    if isinstance(grid, GridGraph):
+        return grid
+    return GridGraph.from_lists(grid)
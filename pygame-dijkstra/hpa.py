@@ -0,0 +1,363 @@
+"""
+Hierarchical path-finding (HPA*) for large grids.
+
+The grid is cut into square clusters. Wherever two neighbouring clusters share
+a run of open cells across their border, the run gets one or two transitions
+(pairs of facing cells). Transition cells are the nodes of a small abstract
+graph: inter edges cross a border in one move, intra edges join the nodes of
+one cluster with the cost of the shortest path inside the cluster.
+
+A query links start and end to the nodes of their clusters, runs A* on the
+abstract graph and then refines each abstract edge into cells with a search
+confined to one cluster. Paths are near-optimal, not guaranteed shortest:
+routes that leave a cluster between transitions are not represented.
+
+Intra edges are computed the first time a cluster is used and then cached;
+precompute() builds them all up front. After wall or terrain edits,
+cells_changed() recomputes the entrances on the borders of the edited clusters
+and rebuilds only the clusters whose nodes or cells changed.
+"""
+import heapq
+from time import perf_counter_ns
+
+from grid_graph import OPEN, as_grid_graph
+
+# Runs of open border cells longer than this get a transition at each end
+# instead of one in the middle
+MAX_SINGLE_ENTRANCE = 6
+
+def _new_counters():
+    return {"relaxations": 0, "pushes": 0, "stale_pops": 0, "peak_frontier": 0}
+
+def _local_search(open_, weights, offsets, source, targets=None, reverse=False, counters=None):
+    """
+    Dijkstra over a small padded block. Stops once every target is settled.
+    With reverse=True distances are to source instead of from it.
+    Returns (dist, prev) dicts keyed by local flat index.
+    counters (dict from _new_counters()), when given, accumulates the search
+    counters of algorithms.py across calls.
+    """
+    dist = {source: 0}
+    prev = {source: -1}
+    done = set()
+    remaining = set(targets) if targets is not None else None
+    heap = [(0, source)]
+    relaxations, pushes, stale_pops, peak_frontier = 0, 1, 0, 1
+    while heap:
+        d, u = heapq.heappop(heap)
+        if u in done:
+            stale_pops += 1
+            continue
+        done.add(u)
+        if remaining is not None:
+            remaining.discard(u)
+            if not remaining:
+                break
+        for off in offsets:
+            v = u + off
+            if open_[v]:
+                relaxations += 1
+                # Moving into a cell costs its weight; backwards, the cell left
+                nd = d + (weights[u] if reverse else weights[v])
+                if nd < dist.get(v, float('inf')):
+                    dist[v] = nd
+                    prev[v] = u
+                    heapq.heappush(heap, (nd, v))
+                    pushes += 1
+        if len(heap) > peak_frontier:
+            peak_frontier = len(heap)
+    if counters is not None:
+        counters["relaxations"] += relaxations
+        counters["pushes"] += pushes
+        counters["stale_pops"] += stale_pops
+        counters["peak_frontier"] = max(counters["peak_frontier"], peak_frontier)
+    return dist, prev
+
+class HPAStar:
+    """
+    Abstract graph of cluster entrances over a GridGraph.
+    Params:
+        grid (GridGraph or list of list): Grid to plan on. A GridGraph is
+            referenced, so edits are seen once reported with cells_changed().
+        cluster_size (int): Side length of the square clusters.
+    """
+
+    def __init__(self, grid, cluster_size=16):
+        self.graph = as_grid_graph(grid)
+        self.cluster_size = cluster_size
+        self.cluster_rows = -(-self.graph.rows // cluster_size)
+        self.cluster_cols = -(-self.graph.cols // cluster_size)
+        # (cluster, "R" or "D") -> [(a, b)]: transitions to the right/lower neighbour
+        self._borders = {}
+        # Node -> {node: cost} edges crossing a border
+        self._inter = {}
+        # Cluster -> set of nodes, and cluster -> {node: {node: cost}} (built lazily)
+        self._nodes = {}
+        self._intra = {}
+        self.build()
+
+    # Geometry
+
+    def cluster_of(self, cell):
+        return (cell[0] // self.cluster_size, cell[1] // self.cluster_size)
+
+    def _bounds(self, cluster):
+        k = self.cluster_size
+        r0, c0 = cluster[0] * k, cluster[1] * k
+        return r0, c0, min(r0 + k, self.graph.rows), min(c0 + k, self.graph.cols)
+
+    def _block(self, cluster):
+        """Padded copy of one cluster: (open bytes, weight bytes, offsets, to_local, to_cell)."""
+        graph = self.graph
+        r0, c0, r1, c1 = self._bounds(cluster)
+        # The cluster plus a one-cell ring, which is closed off like the grid border
+        block = graph.padded[r0:r1 + 2, c0:c1 + 2] == OPEN
+        block[0, :] = block[-1, :] = block[:, 0] = block[:, -1] = False
+        open_ = block.tobytes()
+        weights = graph.costs[r0:r1 + 2, c0:c1 + 2].tobytes()
+        stride = c1 - c0 + 2
+        offsets = (-stride, stride, -1, 1)
+
+        def to_local(cell):
+            return (cell[0] - r0 + 1) * stride + cell[1] - c0 + 1
+
+        def to_cell(index):
+            r, c = divmod(index, stride)
+            return (r - 1 + r0, c - 1 + c0)
+
+        return open_, weights, offsets, to_local, to_cell
+
+    # Entrances
+
+    def _neighbour(self, cluster, side):
+        ci, cj = cluster
+        other = (ci, cj + 1) if side == "R" else (ci + 1, cj)
+        if other[0] < self.cluster_rows and other[1] < self.cluster_cols:
+            return other
+        return None
+
+    def _scan_border(self, cluster, side):
+        """Transitions (a, b) from cluster to its neighbour on side, as flat indices."""
+        graph = self.graph
+        r0, c0, r1, c1 = self._bounds(cluster)
+        if side == "R":
+            pairs = [((r, c1 - 1), (r, c1)) for r in range(r0, r1)]
+        else:
+            pairs = [((r1 - 1, c), (r1, c)) for c in range(c0, c1)]
+        cells = graph.cells
+        transitions = []
+        run = []
+        # A closing (None, None) pair ends the last run
+        for a, b in pairs + [(None, None)]:
+            if a is not None and cells[a] == OPEN and cells[b] == OPEN:
+                run.append((a, b))
+                continue
+            if len(run) > MAX_SINGLE_ENTRANCE:
+                transitions += [run[0], run[-1]]
+            elif run:
+                transitions.append(run[len(run) // 2])
+            run = []
+        return [(graph.index(a), graph.index(b)) for a, b in transitions]
+
+    def _set_border(self, cluster, side):
+        inter, weights = self._inter, self.graph.costs.ravel()
+        for a, b in self._borders.pop((cluster, side), ()):
+            inter[a].pop(b, None)
+            inter[b].pop(a, None)
+        transitions = self._scan_border(cluster, side)
+        if transitions:
+            self._borders[(cluster, side)] = transitions
+        for a, b in transitions:
+            inter.setdefault(a, {})[b] = int(weights[b])
+            inter.setdefault(b, {})[a] = int(weights[a])
+
+    def _cluster_borders(self, cluster):
+        """Yield (border key, position) of each border of cluster; 0 = first cell of the pair."""
+        ci, cj = cluster
+        yield (cluster, "R"), 0
+        yield (cluster, "D"), 0
+        if cj > 0:
+            yield ((ci, cj - 1), "R"), 1
+        if ci > 0:
+            yield ((ci - 1, cj), "D"), 1
+
+    def _set_nodes(self, cluster):
+        nodes = set()
+        for key, side in self._cluster_borders(cluster):
+            nodes.update(pair[side] for pair in self._borders.get(key, ()))
+        self._nodes[cluster] = nodes
+
+    def build(self):
+        """Scan every border and collect the nodes of every cluster."""
+        self._borders.clear()
+        self._inter.clear()
+        self._intra.clear()
+        clusters = [(ci, cj) for ci in range(self.cluster_rows) for cj in range(self.cluster_cols)]
+        for cluster in clusters:
+            for side in ("R", "D"):
+                if self._neighbour(cluster, side) is not None:
+                    self._set_border(cluster, side)
+        for cluster in clusters:
+            self._set_nodes(cluster)
+
+    # Intra-cluster edges
+
+    def _cluster_edges(self, cluster):
+        edges = self._intra.get(cluster)
+        if edges is None:
+            edges = {}
+            nodes = self._nodes[cluster]
+            if len(nodes) > 1:
+                open_, weights, offsets, to_local, to_cell = self._block(cluster)
+                graph = self.graph
+                local = {to_local(graph.cell(n)): n for n in nodes}
+                for source, node in local.items():
+                    dist, _ = _local_search(open_, weights, offsets, source, local)
+                    edges[node] = {local[t]: d for t, d in dist.items() if t in local and t != source}
+            self._intra[cluster] = edges
+        return edges
+
+    def precompute(self):
+        """Build the intra edges of every cluster now instead of on first use."""
+        for cluster in self._nodes:
+            self._cluster_edges(cluster)
+
+    def cells_changed(self, cells):
+        """
+        Rebuild after walls or terrain costs of cells changed: rescan the
+        borders of the edited clusters, then recompute the nodes of every
+        cluster on those borders and the intra edges that were built before.
+        """
+        edited = {self.cluster_of(cell) for cell in cells}
+        touched = set(edited)
+        for cluster in edited:
+            for (owner, side), _ in self._cluster_borders(cluster):
+                if self._neighbour(owner, side) is not None:
+                    self._set_border(owner, side)
+                    touched.add(owner)
+                    touched.add(self._neighbour(owner, side))
+        for cluster in touched:
+            self._set_nodes(cluster)
+            if self._intra.pop(cluster, None) is not None:
+                self._cluster_edges(cluster)
+        return touched
+
+    # Queries
+
+    def _link(self, cell, reverse, counters=None):
+        """Costs between cell and the nodes of its cluster (to cell if reverse)."""
+        cluster = self.cluster_of(cell)
+        open_, weights, offsets, to_local, to_cell = self._block(cluster)
+        graph = self.graph
+        local = {to_local(graph.cell(n)): n for n in self._nodes[cluster]}
+        dist, _ = _local_search(open_, weights, offsets, to_local(cell), local, reverse, counters)
+        return {local[t]: d for t, d in dist.items() if t in local}
+
+    def _refine(self, a, b, counters=None):
+        """Cells after a up to b, from a search inside their shared cluster."""
+        graph = self.graph
+        ca, cb = graph.cell(a), graph.cell(b)
+        if self.cluster_of(ca) != self.cluster_of(cb):
+            return [cb]
+        open_, weights, offsets, to_local, to_cell = self._block(self.cluster_of(ca))
+        source, target = to_local(ca), to_local(cb)
+        _, prev = _local_search(open_, weights, offsets, source, (target,), counters=counters)
+        cells = []
+        cur = target
+        while cur != source:
+            cells.append(to_cell(cur))
+            cur = prev[cur]
+        cells.reverse()
+        return cells
+
+    def query(self, start, end):
+        """
+        Path from start to end as a solver-style dict with "path", "cost"
+        (None when unreachable), "expanded" (abstract nodes settled) and the
+        counters of the algorithms.py solvers. The counters add up the
+        abstract A* and the searches inside clusters (linking start and end,
+        refining the path); intra edges built on first use are not counted.
+        "algo_ns" times the query.
+        """
+        t0 = perf_counter_ns()
+        counters = _new_counters()
+        result = self._query(start, end, counters)
+        result.update(counters)
+        result["algo_ns"] = perf_counter_ns() - t0
+        return result
+
+    def _query(self, start, end, counters):
+        graph = self.graph
+        s, e = graph.index(start), graph.index(end)
+        if graph.cells[start] != OPEN or graph.cells[end] != OPEN:
+            return {"path": [], "cost": None, "expanded": 0}
+        if s == e:
+            return {"path": [start], "cost": 0, "expanded": 0}
+        from_start = self._link(start, reverse=False, counters=counters)
+        to_end = self._link(end, reverse=True, counters=counters)
+        if self.cluster_of(start) == self.cluster_of(end):
+            open_, weights, offsets, to_local, _ = self._block(self.cluster_of(start))
+            dist, _ = _local_search(open_, weights, offsets, to_local(start), (to_local(end),), counters=counters)
+            if to_local(end) in dist:
+                from_start[e] = dist[to_local(end)]
+        from_start.pop(s, None)
+
+        er, ec = end
+        stride = graph.stride
+        g_score = {s: 0}
+        prev = {s: -1}
+        done = set()
+        heap = [(abs(start[0] - er) + abs(start[1] - ec), s)]
+        relaxations, pushes, stale_pops, peak_frontier = 0, 1, 0, 1
+        while heap:
+            _, u = heapq.heappop(heap)
+            if u in done:
+                stale_pops += 1
+                continue
+            done.add(u)
+            if u == e:
+                break
+            if u == s:
+                edges = list(from_start.items()) + list(self._inter.get(s, {}).items())
+            else:
+                edges = list(self._cluster_edges(self.cluster_of(graph.cell(u))).get(u, {}).items())
+                edges += self._inter.get(u, {}).items()
+                if u in to_end:
+                    edges.append((e, to_end[u]))
+            g = g_score[u]
+            for v, cost in edges:
+                relaxations += 1
+                ng = g + cost
+                if ng < g_score.get(v, float('inf')):
+                    g_score[v] = ng
+                    prev[v] = u
+                    r, c = divmod(v, stride)
+                    heapq.heappush(heap, (ng + abs(r - 1 - er) + abs(c - 1 - ec), v))
+                    pushes += 1
+            if len(heap) > peak_frontier:
+                peak_frontier = len(heap)
+        counters["relaxations"] += relaxations
+        counters["pushes"] += pushes
+        counters["stale_pops"] += stale_pops
+        counters["peak_frontier"] = max(counters["peak_frontier"], peak_frontier)
+        if e not in done:
+            return {"path": [], "cost": None, "expanded": len(done)}
+
+        nodes = []
+        cur = e
+        while cur != -1:
+            nodes.append(cur)
+            cur = prev[cur]
+        nodes.reverse()
+        path = [start]
+        for a, b in zip(nodes, nodes[1:]):
+            path += self._refine(a, b, counters)
+        return {"path": path, "cost": g_score[e], "expanded": len(done)}
+
+def solve_hpa(start, end, rows, cols, grid, cluster_size=16):
+    """
+    One-off query in the shape of the algorithms.SOLVERS results; "algo_ns"
+    covers the query, not building the abstract graph. Keep an HPAStar around
+    to reuse its abstract graph.
+    """
+    return HPAStar(grid, cluster_size).query(start, end)
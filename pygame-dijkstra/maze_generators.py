@@ -1,152 +1,199 @@
 import random
 
-def generate_maze_type_1(rows, cols, grid_ref, start_pos, end_pos):
+import numpy as np
+
+from connectivity import ConnectivityIndex
+from grid_graph import GridGraph
+
+def _store(grid_ref, cells):
+    """Copy a finished maze (list of lists or NumPy array) into grid_ref (GridGraph or list of lists)."""
+    if isinstance(grid_ref, GridGraph):
+        grid_ref.cells[:] = cells
+    else:
+        if isinstance(cells, np.ndarray):
+            cells = cells.tolist()
+        for row, values in zip(grid_ref, cells):
+            row[:] = values
+
+def _rng(seed):
+    """
+    NumPy Generator for seed: an int, an existing Generator (used as is) or
+    None, which draws a seed from the global random module so random.seed()
+    still makes runs reproducible.
+    """
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed if seed is not None else random.getrandbits(64))
+
+# Uniform draws fetched from the Generator at a time by the random walk
+WALK_BATCH = 4096
+
+def _free_components(free, stride):
+    """
+    Component label of every cell of a flat padded bool array (-1 where not
+    free), in NumPy: label horizontal runs, link runs that overlap vertically
+    and merge the links by repeated min-label passes with pointer jumping.
+    """
+    run_start = free.copy()
+    run_start[1:] &= ~free[:-1]
+    runs = np.cumsum(run_start) - 1
+    n_runs = int(runs[-1]) + 1 if free.any() else 0
+    # Two overlapping runs meet where the later of the two starts
+    touching = free[:-stride] & free[stride:] & (run_start[:-stride] | run_start[stride:])
+    a, b = runs[:-stride][touching], runs[stride:][touching]
+    roots = np.arange(n_runs)
+    while True:
+        low = np.minimum(roots[a], roots[b])
+        merged = roots.copy()
+        np.minimum.at(merged, roots[a], low)
+        np.minimum.at(merged, roots[b], low)
+        merged = merged[merged]
+        if (merged == roots).all():
+            break
+        roots = merged
+    return np.where(free, roots[runs], -1)
+
+def _random_walk(rows, cols, start_pos, end_pos, rng):
+    """
+    Self-avoiding random walk from start_pos to end_pos that backtracks when
+    stuck. Moves that get closer to the end are twice as likely as the others.
+    The walk can wall itself into a pocket that does not hold the end and
+    would then backtrack through every cell of it; so when stuck after
+    visiting many new cells, every such pocket is blocked in one vectorized
+    pass. Returns the (rows, cols) index arrays of the cells on the path.
+    """
+    stride = cols + 2
+    # Flat padded grid of cells the walk may not enter: the border and visited cells
+    padded = np.ones((rows + 2, stride), dtype=np.uint8)
+    padded[1:-1, 1:-1] = 0
+    blocked = bytearray(padded.tobytes())
+    view = np.frombuffer(blocked, dtype=np.uint8)
+    er, ec = end_pos[0] + 1, end_pos[1] + 1
+    e = er * stride + ec
+    u = (start_pos[0] + 1) * stride + start_pos[1] + 1
+    blocked[u] = 1
+    path_cells = [u]
+    check_every = max(1024, rows * cols // 256)
+    since_check = 0
+    draws = rng.random(WALK_BATCH).tolist()
+    k = 0
+    while u != e:
+        r, c = divmod(u, stride)
+        neighbors = []
+        weights = []
+        for off, closer in ((1, c < ec), (stride, r < er), (-1, c > ec), (-stride, r > er)):
+            if not blocked[u + off]:
+                neighbors.append(u + off)
+                weights.append(2 if closer else 1)
+        if not neighbors:
+            if since_check >= check_every and len(path_cells) > 1:
+                # Block every free cell that can no longer reach the end
+                labels = _free_components(view == 0, stride)
+                view[(labels >= 0) & (labels != labels[e])] = 1
+                since_check = 0
+            # Stuck: step back to the previous cell, or give up at the start
+            if len(path_cells) > 1:
+                path_cells.pop()
+                u = path_cells[-1]
+                continue
+            break
+        if k == WALK_BATCH:
+            draws = rng.random(WALK_BATCH).tolist()
+            k = 0
+        pick = draws[k] * sum(weights)
+        k += 1
+        for v, weight in zip(neighbors, weights):
+            pick -= weight
+            if pick < 0:
+                break
+        blocked[v] = 1
+        since_check += 1
+        path_cells.append(v)
+        u = v
+    path = np.array(path_cells, dtype=np.intp)
+    return path // stride - 1, path % stride - 1
+
+def generate_maze_type_1(rows, cols, grid_ref, start_pos, end_pos, seed=None):
     """
     Maze type 1: Random winding path with minimal heuristic advantage for A*
     Params:
         rows (int): Number of rows in the grid.
         cols (int): Number of columns in the grid.
-        grid_ref (list of list): The grid to modify.
+        grid_ref (GridGraph or list of list): The grid to modify.
         start_pos (tuple): Start cell (row, col).
         end_pos (tuple): End cell (row, col).
+        seed (int or numpy.random.Generator): Seed or generator for
+            reproducible mazes. If None, the seed comes from the global random module.
     """
-    # Set all cells as walls
-    for row in range(rows):
-        for col in range(cols):
-            grid_ref[row][col] = 1
+    rng = _rng(seed)
+    g = np.ones((rows, cols), dtype=np.uint8)
 
-    # Start at the start cell, carve a random winding path to the end
-    r, c = start_pos
-    path_cells = [(r, c)]
-    visited_cells = set(path_cells)
-    while (r, c) != end_pos:
-        neighbors = []
-        # Only allow moves that stay in bounds and are not visited
-        for dr, dc in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-            nr, nc = r + dr, c + dc
-            if 0 <= nr < rows and 0 <= nc < cols and (nr, nc) not in visited_cells:
-                # Prefer moves that get closer to the end, but allow some randomness
-                dist_now = abs(r - end_pos[0]) + abs(c - end_pos[1])
-                dist_next = abs(nr - end_pos[0]) + abs(nc - end_pos[1])
-                weight = 2 if dist_next < dist_now else 1
-                neighbors.extend([(nr, nc)] * weight)
-        if not neighbors:
-            # If stuck, backtrack to previous cell
-            if len(path_cells) > 1:
-                path_cells.pop()
-                r, c = path_cells[-1]
-                continue
-            else:
-                break  # No path possible
-        next_cell = random.choice(neighbors)
-        path_cells.append(next_cell)
-        visited_cells.add(next_cell)
-        r, c = next_cell
-
-    # Carve the path in the grid
-    for cell in path_cells:
-        grid_ref[cell[0]][cell[1]] = 0
-
-    # Randomly open enough extra cells so that walls are 50-60% of the grid
+    # Carve a random winding path from the start to the end
+    g[_random_walk(rows, cols, start_pos, end_pos, rng)] = 0
+
+    # Open random closed cells until walls are 50-60% of the grid
     total_cells = rows * cols
-    open_cells = sum(1 for row in range(rows) for col in range(cols) if grid_ref[row][col] == 0)
-    min_walls = int(total_cells * 0.5)
-    max_walls = int(total_cells * 0.6)
-    target_walls = random.randint(min_walls, max_walls)
-    target_open = total_cells - target_walls
-    extra_to_open = max(0, target_open - open_cells)
-    opened = 0
-    attempts = 0
-    while opened < extra_to_open and attempts < total_cells * 5:
-        rr = random.randint(0, rows - 1)
-        cc = random.randint(0, cols - 1)
-        if grid_ref[rr][cc] == 1 and (rr, cc) != start_pos and (rr, cc) != end_pos:
-            grid_ref[rr][cc] = 0
-            opened += 1
-        attempts += 1
+    target_walls = int(rng.integers(int(total_cells * 0.5), int(total_cells * 0.6), endpoint=True))
+    closed = np.flatnonzero(g)
+    closed = closed[(closed != start_pos[0] * cols + start_pos[1]) & (closed != end_pos[0] * cols + end_pos[1])]
+    extra_to_open = min(max(0, (total_cells - target_walls) - (total_cells - len(closed))), len(closed))
+    g.ravel()[rng.choice(closed, extra_to_open, replace=False)] = 0
 
     # Ensure start and end are open
-    grid_ref[start_pos[0]][start_pos[1]] = 0
-    grid_ref[end_pos[0]][end_pos[1]] = 0
+    g[start_pos] = 0
+    g[end_pos] = 0
+    _store(grid_ref, g)
 
-def generate_maze_type_2(rows, cols, grid_ref, start_pos, end_pos):
+def generate_maze_type_2(rows, cols, grid_ref, start_pos, end_pos, seed=None):
     """
     Maze type 2: Random maze with vertical bias using wall probability.
     Ensures at least 2 distinct paths from start to end.
     Params:
         rows (int): Number of rows in the grid.
         cols (int): Number of columns in the grid.
-        grid_ref (list of list): The grid to modify.
+        grid_ref (GridGraph or list of list): The grid to modify.
         start_pos (tuple): Start cell (row, col).
         end_pos (tuple): End cell (row, col).
+        seed (int or numpy.random.Generator): Seed or generator for
+            reproducible mazes. If None, the seed comes from the global random module.
     """
+    rng = _rng(seed)
     wall_prob = 0.3  # You can adjust this for more/less walls
 
-    # Step 1: Fill grid with walls according to vertical bias
-    for row in range(rows):
-        for col in range(cols):
-            prob = wall_prob + 0.3 if col % 2 == 1 else wall_prob
-            grid_ref[row][col] = 1 if random.random() < prob else 0
+    # Step 1: Fill grid with walls, odd columns are more likely to be walls
+    col_prob = np.where(np.arange(cols) % 2 == 1, wall_prob + 0.3, wall_prob)
+    g = (rng.random((rows, cols)) < col_prob).astype(np.uint8)
 
     # Step 2: Carve two random paths from start to end
-    def carve_random_path():
-        r, c = start_pos
-        path_cells = [(r, c)]
-        visited_cells = set(path_cells)
-        while (r, c) != end_pos:
-            neighbors = []
-            for dr, dc in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                nr, nc = r + dr, c + dc
-                if 0 <= nr < rows and 0 <= nc < cols and (nr, nc) not in visited_cells:
-                    dist_now = abs(r - end_pos[0]) + abs(c - end_pos[1])
-                    dist_next = abs(nr - end_pos[0]) + abs(nc - end_pos[1])
-                    weight = 2 if dist_next < dist_now else 1
-                    neighbors.extend([(nr, nc)] * weight)
-            if not neighbors:
-                if len(path_cells) > 1:
-                    path_cells.pop()
-                    r, c = path_cells[-1]
-                    continue
-                else:
-                    break
-            next_cell = random.choice(neighbors)
-            path_cells.append(next_cell)
-            visited_cells.add(next_cell)
-            r, c = next_cell
-        return path_cells
-
-    path1 = carve_random_path()
-    path2 = carve_random_path()
-
-    # Step 3: Open the cells along both paths
-    for cell in path1:
-        grid_ref[cell[0]][cell[1]] = 0
-    for cell in path2:
-        grid_ref[cell[0]][cell[1]] = 0
-
-    # Step 4: Ensure start and end are open
-    grid_ref[start_pos[0]][start_pos[1]] = 0
-    grid_ref[end_pos[0]][end_pos[1]] = 0
-
-def generate_maze_type_3(rows, cols, grid_ref, start_pos, end_pos):
+    g[_random_walk(rows, cols, start_pos, end_pos, rng)] = 0
+    g[_random_walk(rows, cols, start_pos, end_pos, rng)] = 0
+
+    # Step 3: Ensure start and end are open
+    g[start_pos] = 0
+    g[end_pos] = 0
+    _store(grid_ref, g)
+
+def generate_maze_type_3(rows, cols, grid_ref, start_pos, end_pos, seed=None):
     """
     Maze type 3: Recursive Backtracking Maze (Perfect Maze)
-    Ensures the start cell always has at least one open neighbor (a way out).
+    Ensures the start cell always has at least one open neighbor (a way out)
+    and that the end is reachable from the start.
     Params:
         rows (int): Number of rows in the grid.
         cols (int): Number of columns in the grid.
-        grid_ref (list of list): The grid to modify (if None, uses global grid).
+        grid_ref (GridGraph or list of list): The grid to modify.
         start_pos (tuple): Start cell (row, col). If None, uses global start.
         end_pos (tuple): End cell (row, col). If None, uses global end.
+        seed (int): Seed for a private random generator, so the same seed
+            rebuilds the same maze. If None, the global random module is used.
     """
-    g = grid_ref
+    rng = random.Random(seed) if seed is not None else random
     s = start_pos
     e = end_pos
 
-    # Initialize all cells as walls
-    for row in range(rows):
-        for col in range(cols):
-            g[row][col] = -2  # wall
+    # Initialize all cells as walls; carving works on a local list of lists
+    # and writes straight to 0 (path), so no conversion pass is needed
+    g = [[1] * cols for _ in range(rows)]
 
     def in_bounds(r, c):
         return 0 <= r < rows and 0 <= c < cols
@@ -157,9 +204,9 @@ def generate_maze_type_3(rows, cols, grid_ref, start_pos, end_pos):
         result = []
         for dr, dc in dirs:
             nr, nc = r + dr, c + dc
-            if in_bounds(nr, nc) and g[nr][nc] == -2:
+            if in_bounds(nr, nc) and g[nr][nc] == 1:
                 result.append((nr, nc))
-        random.shuffle(result)
+        rng.shuffle(result)
         return result
 
     # Start at a cell with odd coordinates for best results
@@ -167,7 +214,7 @@ def generate_maze_type_3(rows, cols, grid_ref, start_pos, end_pos):
     sr = sr if sr % 2 == 1 else 1
     sc = sc if sc % 2 == 1 else 1
     stack = [(sr, sc)]
-    g[sr][sc] = -1  # path
+    g[sr][sc] = 0  # path
 
     while stack:
         r, c = stack[-1]
@@ -176,20 +223,12 @@ def generate_maze_type_3(rows, cols, grid_ref, start_pos, end_pos):
             nr, nc = nbs[0]
             # Remove wall between (r, c) and (nr, nc)
             wall_r, wall_c = (r + nr) // 2, (c + nc) // 2
-            g[wall_r][wall_c] = -1  # path
-            g[nr][nc] = -1  # path
+            g[wall_r][wall_c] = 0  # path
+            g[nr][nc] = 0  # path
             stack.append((nr, nc))
         else:
             stack.pop()
 
-    # Convert -1 to 0 (path), -2 to 1 (wall)
-    for row in range(rows):
-        for col in range(cols):
-            if g[row][col] == -1:
-                g[row][col] = 0
-            else:
-                g[row][col] = 1
-
     # Ensure start and end are open
     g[s[0]][s[1]] = 0
     g[e[0]][e[1]] = 0
@@ -205,9 +244,141 @@ def generate_maze_type_3(rows, cols, grid_ref, start_pos, end_pos):
             break
     if not has_exit:
         # Open a random neighbor cell
-        random.shuffle(directions)
+        rng.shuffle(directions)
         for dr, dc in directions:
             nr, nc = sr + dr, sc + dc
             if 0 <= nr < rows and 0 <= nc < cols:
                 g[nr][nc] = 0
-                break
\ No newline at end of file
+                break
+
+    # Ends on even coordinates can be cut off from the carved cells; open
+    # neighbours of the end until the component index joins it to the start
+    index = ConnectivityIndex(g)
+    er, ec = e
+    for dr, dc in directions:
+        if index.connected(s, e):
+            break
+        nr, nc = er + dr, ec + dc
+        if 0 <= nr < rows and 0 <= nc < cols and g[nr][nc] == 1:
+            g[nr][nc] = 0
+            index.graph[nr][nc] = 0
+            index.wall_removed((nr, nc))
+
+    _store(grid_ref, g)
+
+def _nearest_cell(i, count):
+    """Index of the nearest maze cell (odd, at most 2 * count - 1) to grid index i."""
+    return min(i | 1, 2 * count - 1)
+
+def eller_rows(rows, cols, start_pos, end_pos, seed=None):
+    """
+    Perfect maze by Eller's algorithm, produced one grid row at a time.
+    Cells sit on odd coordinates like in type 3. Only the set labels of the
+    current maze row are kept, so working memory is O(cols) and rows can be
+    written straight to a file or a grid as they come.
+    Params:
+        rows (int): Number of rows in the grid.
+        cols (int): Number of columns in the grid.
+        start_pos (tuple): Start cell (row, col), opened and joined to the maze.
+        end_pos (tuple): End cell (row, col), opened and joined to the maze.
+        seed (int or numpy.random.Generator): Seed or generator; see _rng.
+    Yields:
+        numpy.ndarray: A new uint8 array of cols values per grid row (1 = wall).
+    """
+    rng = _rng(seed)
+    maze_rows, maze_cols = rows // 2, cols // 2
+
+    # Start and end are joined to their nearest cell by opening cells along
+    # their own grid row (plus one vertical step that lands on a cell)
+    openings = {}
+    for r, c in (start_pos, end_pos):
+        if maze_rows and maze_cols:
+            nc = _nearest_cell(c, maze_cols)
+            openings.setdefault(r, []).append((min(c, nc), max(c, nc) + 1))
+        else:
+            openings.setdefault(r, []).append((c, c + 1))
+
+    def emit(r, row):
+        for lo, hi in openings.get(r, ()):
+            row[lo:hi] = 0
+        return row
+
+    if not maze_rows or not maze_cols:
+        # Too thin for walls between cells: a single open corridor
+        for r in range(rows):
+            yield emit(r, np.zeros(cols, dtype=np.uint8))
+        return
+
+    yield emit(0, np.ones(cols, dtype=np.uint8))
+    labels = list(range(maze_cols))
+    next_label = maze_cols
+    for i in range(maze_rows):
+        last = i == maze_rows - 1
+        parent = {}
+
+        def find(x):
+            while x in parent:
+                x = parent[x]
+            return x
+
+        # Join neighbours of different sets at random; the last row joins them all
+        join = rng.random(maze_cols - 1) < 0.5
+        opened = np.zeros(maze_cols - 1, dtype=bool)
+        for j in range(maze_cols - 1):
+            a, b = find(labels[j]), find(labels[j + 1])
+            if a != b and (last or join[j]):
+                parent[b] = a
+                opened[j] = True
+        labels = [find(label) for label in labels]
+
+        row = np.ones(cols, dtype=np.uint8)
+        row[1:2 * maze_cols:2] = 0
+        row[2:2 * maze_cols - 1:2][opened] = 0
+        yield emit(2 * i + 1, row)
+        if last:
+            break
+
+        # Carve down at random, then at least once per set at a random member
+        down = rng.random(maze_cols) < 0.5
+        rank = rng.random(maze_cols).tolist()
+        has_down = set()
+        pick = {}
+        for j, label in enumerate(labels):
+            if down[j]:
+                has_down.add(label)
+            elif label not in pick or rank[j] > rank[pick[label]]:
+                pick[label] = j
+        for label, j in pick.items():
+            if label not in has_down:
+                down[j] = True
+
+        row = np.ones(cols, dtype=np.uint8)
+        row[1:2 * maze_cols:2][down] = 0
+        yield emit(2 * i + 2, row)
+        # Cells below a passage keep their set; the others start new sets
+        for j in range(maze_cols):
+            if not down[j]:
+                labels[j] = next_label
+                next_label += 1
+
+    # With an odd number of rows the grid ends on a wall row
+    for r in range(2 * maze_rows, rows):
+        yield emit(r, np.ones(cols, dtype=np.uint8))
+
+def generate_maze_eller(rows, cols, grid_ref, start_pos, end_pos, seed=None):
+    """
+    Maze type 4: Perfect maze by Eller's algorithm (see eller_rows), written
+    into grid_ref row by row.
+    Params:
+        rows (int): Number of rows in the grid.
+        cols (int): Number of columns in the grid.
+        grid_ref (GridGraph or list of list): The grid to modify.
+        start_pos (tuple): Start cell (row, col).
+        end_pos (tuple): End cell (row, col).
+        seed (int): Seed for the generator; see eller_rows.
+    """
+    for r, row in enumerate(eller_rows(rows, cols, start_pos, end_pos, seed)):
+        if isinstance(grid_ref, GridGraph):
+            grid_ref.cells[r] = row
+        else:
+            grid_ref[r][:] = row.tolist()
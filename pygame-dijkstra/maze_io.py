@@ -0,0 +1,211 @@
+"""
+Loading and saving mazes as files.
+
+Supported formats:
+    .maze: Bit-packed binary maze (save_packed / open_packed). A fixed header
+           holds the size, start, end, generator type and seed, followed by
+           the wall bitmap at 1 bit per cell, each row padded to whole bytes.
+           A maze with terrain appends its costs as one byte per cell.
+    .npy: A 2D array of cells (0 = open, anything else = wall), or a
+          (2, rows, cols) array stacking cells and terrain costs.
+    text: One line per row, one character per cell: '#' is a wall, '.' an
+          open cell of cost 1 and '1'-'9' an open cell of that terrain cost.
+          All lines must have the same length.
+
+All formats are memory-mapped and copied into the GridGraph a block of rows
+at a time, so large files are never read into Python lists or held in memory
+twice.
+"""
+import struct
+
+import numpy as np
+
+from grid_graph import GridGraph, MIN_COST, MAX_COST, OPEN, WALL
+
+# Rows copied from the mapped file per step
+CHUNK_ROWS = 1024
+
+WALL_CHAR = ord('#')
+OPEN_CHAR = ord('.')
+
+# Packed header: magic, version, flags, generator type, padding, rows, cols,
+# start (row, col), end (row, col), seed (-1 when unknown)
+PACKED_MAGIC = b"MAZE"
+PACKED_VERSION = 1
+PACKED_HEADER = struct.Struct("<4sBBBxIIIIIIq")
+# Flags
+HAS_COSTS = 1
+
+def load_maze(path):
+    """
+    Load a maze file into a new GridGraph, choosing the format by extension.
+    Params:
+        path (str): A .maze file, a .npy file or a text maze.
+    """
+    if str(path).endswith(".maze"):
+        return open_packed(path).to_grid()
+    if str(path).endswith(".npy"):
+        return load_npy(path)
+    return load_text(path)
+
+def load_npy(path):
+    data = np.load(path, mmap_mode="r")
+    if data.ndim == 3 and data.shape[0] == 2:
+        cells, costs = data[0], data[1]
+    elif data.ndim == 2:
+        cells, costs = data, None
+    else:
+        raise ValueError(f"{path}: expected a 2D array or a (2, rows, cols) array, got shape {data.shape}")
+    rows, cols = cells.shape
+    graph = GridGraph(rows, cols)
+    for r in range(0, rows, CHUNK_ROWS):
+        block = slice(r, r + CHUNK_ROWS)
+        graph.cells[block] = np.where(cells[block] != OPEN, WALL, OPEN)
+        if costs is not None:
+            graph.cost_cells[block] = np.clip(costs[block], MIN_COST, MAX_COST)
+    return graph
+
+def load_text(path):
+    with open(path, "rb") as f:
+        first = f.readline()
+    if not first:
+        raise ValueError(f"{path}: empty maze file")
+    # The map is unmapped once the last view of it is gone
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    # Windows line endings: the '\r' is part of the line terminator
+    cols = len(first.rstrip(b"\r\n"))
+    line = len(first) if first.endswith(b"\n") else len(first) + 1
+    # The last line may lack its newline
+    rows = -(-len(data) // line)
+    if cols == 0 or (rows - 1) * line + cols > len(data):
+        raise ValueError(f"{path}: lines must all have the same length")
+    graph = GridGraph(rows, cols)
+    for r in range(0, rows, CHUNK_ROWS):
+        n = min(CHUNK_ROWS, rows - r)
+        chunk = data[r * line:(r + n) * line]
+        if len(chunk) < n * line:
+            # Pad the unterminated last line so the block reshapes evenly
+            chunk = np.concatenate([chunk, np.full(n * line - len(chunk), ord('\n'), dtype=np.uint8)])
+        chars = chunk.reshape(n, line)[:, :cols]
+        if not (chunk.reshape(n, line)[:, -1] == ord('\n')).all():
+            raise ValueError(f"{path}: lines must all have the same length")
+        walls = chars == WALL_CHAR
+        digits = (chars >= ord('1')) & (chars <= ord('9'))
+        bad = ~(walls | digits | (chars == OPEN_CHAR))
+        if bad.any():
+            br, bc = np.argwhere(bad)[0]
+            raise ValueError(f"{path}:{r + br + 1}:{bc + 1}: unexpected character {chr(chars[br, bc])!r}")
+        graph.cells[r:r + n] = walls
+        graph.cost_cells[r:r + n] = np.where(digits, chars - ord('0'), MIN_COST)
+    return graph
+
+class PackedMaze:
+    """
+    A .maze file mapped into memory. Opening reads only the header; the wall
+    bitmap stays on disk until rows are unpacked.
+    Attributes:
+        rows, cols (int): Grid size.
+        start, end (tuple): Start and end cells.
+        generator (int): Maze generator type (0 when drawn by hand).
+        seed (int): Generator seed, or -1 when unknown.
+        bits (numpy.memmap): Packed walls, one row of bytes per grid row.
+        costs (numpy.memmap or None): Terrain costs when the maze has any.
+    Params:
+        path (str): File written by save_packed.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            header = f.read(PACKED_HEADER.size)
+        if len(header) < PACKED_HEADER.size or header[:4] != PACKED_MAGIC:
+            raise ValueError(f"{path}: not a packed maze file")
+        (_, version, flags, self.generator, self.rows, self.cols,
+         sr, sc, er, ec, self.seed) = PACKED_HEADER.unpack(header)
+        if version != PACKED_VERSION:
+            raise ValueError(f"{path}: unsupported packed maze version {version}")
+        self.start = (sr, sc)
+        self.end = (er, ec)
+        row_bytes = -(-self.cols // 8)
+        offset = PACKED_HEADER.size
+        self.bits = np.memmap(path, dtype=np.uint8, mode="r", offset=offset, shape=(self.rows, row_bytes))
+        self.costs = None
+        if flags & HAS_COSTS:
+            self.costs = np.memmap(path, dtype=np.uint8, mode="r", offset=offset + self.bits.size,
+                                   shape=(self.rows, self.cols))
+
+    def unpack(self, r0=0, r1=None):
+        """Walls of rows r0 to r1 as a uint8 array (1 = wall)."""
+        return np.unpackbits(self.bits[r0:r1], axis=1, count=self.cols)
+
+    def is_wall(self, cell):
+        r, c = cell
+        return bool(self.bits[r, c >> 3] >> (7 - (c & 7)) & 1)
+
+    def copy_into(self, graph):
+        """Write walls and terrain into a GridGraph of the same size, a block of rows at a time."""
+        if (graph.rows, graph.cols) != (self.rows, self.cols):
+            raise ValueError(f"maze is {self.rows}x{self.cols}, grid is {graph.rows}x{graph.cols}")
+        for r in range(0, self.rows, CHUNK_ROWS):
+            graph.cells[r:r + CHUNK_ROWS] = self.unpack(r, r + CHUNK_ROWS)
+            if self.costs is not None:
+                graph.cost_cells[r:r + CHUNK_ROWS] = self.costs[r:r + CHUNK_ROWS]
+            else:
+                graph.cost_cells[r:r + CHUNK_ROWS] = MIN_COST
+        return graph
+
+    def to_grid(self):
+        return self.copy_into(GridGraph(self.rows, self.cols))
+
+def open_packed(path):
+    """Map a .maze file; see PackedMaze."""
+    return PackedMaze(path)
+
+def save_packed_rows(path, rows, cols, start, end, wall_rows, generator=0, seed=-1):
+    """
+    Write a .maze file from a stream of rows, e.g. maze_generators.eller_rows,
+    without ever holding the whole maze in memory.
+    Params:
+        path (str): Output file.
+        rows (int): Number of rows the stream yields.
+        cols (int): Number of columns per row.
+        start (tuple): Start cell (row, col).
+        end (tuple): End cell (row, col).
+        wall_rows (iterable): One array of cols values per row (nonzero = wall).
+        generator (int): Maze generator type, 0 for a hand-drawn maze.
+        seed (int): Seed the generator was run with, -1 if unknown.
+    """
+    written = 0
+    with open(path, "wb") as f:
+        f.write(PACKED_HEADER.pack(PACKED_MAGIC, PACKED_VERSION, 0, generator,
+                                   rows, cols, start[0], start[1], end[0], end[1], seed))
+        block = []
+        for row in wall_rows:
+            block.append(np.packbits(np.asarray(row) != OPEN).tobytes())
+            written += 1
+            if len(block) == CHUNK_ROWS:
+                f.write(b"".join(block))
+                block.clear()
+        f.write(b"".join(block))
+    if written != rows:
+        raise ValueError(f"expected {rows} rows, got {written}")
+
+def save_packed(path, graph, start, end, generator=0, seed=-1):
+    """
+    Write graph as a bit-packed .maze file.
+    Params:
+        path (str): Output file.
+        graph (GridGraph): Maze to save.
+        start (tuple): Start cell (row, col).
+        end (tuple): End cell (row, col).
+        generator (int): Maze generator type, 0 for a hand-drawn maze.
+        seed (int): Seed the generator was run with, -1 if unknown.
+    """
+    has_costs = not graph.is_uniform()
+    with open(path, "wb") as f:
+        f.write(PACKED_HEADER.pack(PACKED_MAGIC, PACKED_VERSION, HAS_COSTS if has_costs else 0, generator,
+                                   graph.rows, graph.cols, start[0], start[1], end[0], end[1], seed))
+        for r in range(0, graph.rows, CHUNK_ROWS):
+            f.write(np.packbits(graph.cells[r:r + CHUNK_ROWS] != OPEN, axis=1).tobytes())
+        if has_costs:
+            for r in range(0, graph.rows, CHUNK_ROWS):
+                f.write(np.ascontiguousarray(graph.cost_cells[r:r + CHUNK_ROWS]).tobytes())
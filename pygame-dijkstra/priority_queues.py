@@ -0,0 +1,156 @@
+"""
+Priority queues for the weighted searches in algorithms.py.
+
+Every queue has the same small interface:
+    update(item, key): insert item, or lower its key if it is already queued.
+    pop(): remove and return the (key, item) pair with the smallest key.
+    len(queue): number of entries currently held.
+    peak: largest number of entries held at once.
+
+Only IndexedHeap implements a real decrease-key. HeapQueue and RadixHeap push
+a duplicate entry instead, so searches must keep skipping stale pops of cells
+they have already settled.
+"""
+import heapq
+
+class HeapQueue:
+    """heapq with lazy deletion: update() always pushes a new (key, item) entry."""
+
+    def __init__(self):
+        self._heap = []
+        self.peak = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def update(self, item, key):
+        heap = self._heap
+        heapq.heappush(heap, (key, item))
+        if len(heap) > self.peak:
+            self.peak = len(heap)
+
+    def pop(self):
+        return heapq.heappop(self._heap)
+
+class IndexedHeap:
+    """
+    Binary min-heap of (key, item) pairs with a position index per item, so
+    update() can decrease a key in place and the heap never holds more than
+    one entry per item. Ties are broken by item, exactly like heapq on tuples.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._pos = {}
+        self.peak = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def update(self, item, key):
+        heap = self._heap
+        pos = self._pos.get(item)
+        if pos is None:
+            heap.append((key, item))
+            self._pos[item] = len(heap) - 1
+            self._sift_up(len(heap) - 1)
+            if len(heap) > self.peak:
+                self.peak = len(heap)
+        elif (key, item) < heap[pos]:
+            heap[pos] = (key, item)
+            self._sift_up(pos)
+
+    def pop(self):
+        heap = self._heap
+        top = heap[0]
+        last = heap.pop()
+        del self._pos[top[1]]
+        if heap:
+            heap[0] = last
+            self._pos[last[1]] = 0
+            self._sift_down(0)
+        return top
+
+    def _sift_up(self, i):
+        heap, pos = self._heap, self._pos
+        entry = heap[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if entry < heap[parent]:
+                heap[i] = heap[parent]
+                pos[heap[i][1]] = i
+                i = parent
+            else:
+                break
+        heap[i] = entry
+        pos[entry[1]] = i
+
+    def _sift_down(self, i):
+        heap, pos = self._heap, self._pos
+        n = len(heap)
+        entry = heap[i]
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            if child + 1 < n and heap[child + 1] < heap[child]:
+                child += 1
+            if heap[child] < entry:
+                heap[i] = heap[child]
+                pos[heap[i][1]] = i
+                i = child
+            else:
+                break
+        heap[i] = entry
+        pos[entry[1]] = i
+
+class RadixHeap:
+    """
+    Radix heap for non-negative integer keys that never drop below the last
+    popped key (true for Dijkstra, and for A* with a consistent heuristic).
+    Entries are bucketed by the highest bit in which their key differs from
+    the last popped key; a pop only redistributes the first non-empty bucket.
+    """
+
+    def __init__(self):
+        self._buckets = [[] for _ in range(65)]
+        self._last = 0
+        self._size = 0
+        self.peak = 0
+
+    def __len__(self):
+        return self._size
+
+    def update(self, item, key):
+        if key < self._last:
+            raise ValueError(f"RadixHeap keys must be monotone: {key} < {self._last}")
+        self._buckets[(key ^ self._last).bit_length()].append((key, item))
+        self._size += 1
+        if self._size > self.peak:
+            self.peak = self._size
+
+    def pop(self):
+        buckets = self._buckets
+        if not buckets[0]:
+            i = 1
+            while not buckets[i]:
+                i += 1
+            entries = buckets[i]
+            buckets[i] = []
+            last = self._last = min(entry[0] for entry in entries)
+            for entry in entries:
+                buckets[(entry[0] ^ last).bit_length()].append(entry)
+        self._size -= 1
+        return buckets[0].pop()
+
+QUEUES = {
+    "heapq": HeapQueue,
+    "indexed": IndexedHeap,
+    "radix": RadixHeap,
+}
+
+def make_queue(name):
+    try:
+        return QUEUES[name]()
+    except KeyError:
+        raise ValueError(f"unknown queue {name!r}; expected one of {', '.join(QUEUES)}") from None
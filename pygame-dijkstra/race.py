@@ -0,0 +1,133 @@
+"""
+Race several solvers on the same grid and rank them.
+
+Each algorithm runs on its own core: the headless solvers from
+algorithms.SOLVERS are submitted together to a forked process pool, and every
+run is timed with perf_counter_ns around the solver call only (the solvers'
+own "algo_ns"), so neither rendering nor process start-up is counted. Each
+solver runs a few times and keeps its fastest run. Without fork the solvers
+run one per poll() in this process.
+
+A Race never blocks: the caller polls it once per frame, like
+search_worker.SearchWorker, and can cancel it at any time.
+"""
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+
+from algorithms import QUEUE_ALGORITHMS, SOLVERS
+from search_worker import WORKER_AVAILABLE
+
+RACE_ALGORITHMS = ("dijkstra", "astar", "bfs", "dfs")
+# Runs per algorithm; the fastest is kept
+RACE_REPEATS = 3
+
+# Grid shared with the pool workers; forked, never pickled
+_GRAPH = None
+
+def _share_graph(graph):
+    global _GRAPH
+    _GRAPH = graph
+
+def _run(task):
+    algorithm, start, end, repeats, queue = task
+    graph = _GRAPH
+    options = {"queue": queue} if algorithm in QUEUE_ALGORITHMS else {}
+    best = None
+    for _ in range(repeats):
+        result = SOLVERS[algorithm](start, end, graph.rows, graph.cols, graph, **options)
+        if best is None or result["algo_ns"] < best["algo_ns"]:
+            best = result
+    return {
+        "algorithm": algorithm,
+        "time_ms": best["algo_ns"] / 1e6,
+        "expanded": best["expanded"],
+        "path_length": len(best["path"]),
+        "cost": best["cost"],
+    }
+
+class Race:
+    """
+    Solvers racing on a grid in the background. poll() collects the runs
+    that finished since the last call; leaderboard() ranks them, and failed
+    maps each algorithm whose run raised or whose worker died to the error.
+    Params:
+        graph (GridGraph): Grid to solve; it must not change during the race.
+        start, end (tuple): Start and end cells.
+        algorithms (tuple): Keys of algorithms.SOLVERS.
+        repeats (int): Runs per algorithm; the fastest is kept.
+        queue (str): Priority queue for Dijkstra and A* (a key of priority_queues.QUEUES).
+    """
+
+    def __init__(self, graph, start, end, algorithms=RACE_ALGORITHMS, repeats=RACE_REPEATS, queue="heapq"):
+        self.results = []
+        self.failed = {}
+        self.pending = {algorithm: (algorithm, start, end, repeats, queue) for algorithm in algorithms}
+        self.pool = None
+        if WORKER_AVAILABLE:
+            self.pool = ProcessPoolExecutor(max_workers=len(algorithms), mp_context=multiprocessing.get_context("fork"),
+                                            initializer=_share_graph, initargs=(graph,))
+            self.pending = {algorithm: self.pool.submit(_run, task) for algorithm, task in self.pending.items()}
+        else:
+            self.graph = graph
+
+    @property
+    def done(self):
+        return not self.pending
+
+    def poll(self):
+        """Collect finished and failed runs without waiting; returns how many ended."""
+        finished = []
+        failed = len(self.failed)
+        if self.pool is None:
+            # One solver per call, so a call never takes more than one run
+            if self.pending:
+                algorithm = next(iter(self.pending))
+                _share_graph(self.graph)
+                try:
+                    finished.append(_run(self.pending.pop(algorithm)))
+                except Exception as exc:
+                    self._fail(algorithm, exc)
+        else:
+            for algorithm, future in list(self.pending.items()):
+                if not future.done():
+                    continue
+                del self.pending[algorithm]
+                try:
+                    finished.append(future.result())
+                except BrokenProcessPool as exc:
+                    # A worker died (e.g. killed for memory): every run still
+                    # pending went down with the pool
+                    for name in (algorithm, *self.pending):
+                        self._fail(name, exc)
+                    self.pending = {}
+                    self.pool.shutdown(wait=False, cancel_futures=True)
+                    break
+                except Exception as exc:
+                    self._fail(algorithm, exc)
+            if not self.pending:
+                self.pool.shutdown(wait=False)
+        self.results.extend(finished)
+        return len(finished) + len(self.failed) - failed
+
+    def _fail(self, algorithm, exc):
+        self.failed[algorithm] = f"{type(exc).__name__}: {exc}"
+
+    def leaderboard(self):
+        """Finished runs as dicts (algorithm, time_ms, expanded, path_length, cost), fastest first."""
+        return sorted(self.results, key=lambda row: row["time_ms"])
+
+    def cancel(self):
+        """Drop the runs still going; a worker already solving finishes in the background."""
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+        self.pending = {}
+
+def race(graph, start, end, algorithms=RACE_ALGORITHMS, repeats=RACE_REPEATS, queue="heapq"):
+    """Run a Race to the end and return its leaderboard (blocks; for scripts)."""
+    contest = Race(graph, start, end, algorithms, repeats, queue)
+    while not contest.done:
+        if not contest.poll() and contest.pool is not None:
+            # Wait for the next run instead of spinning
+            wait(contest.pending.values(), timeout=0.01, return_when=FIRST_COMPLETED)
+    return contest.leaderboard()
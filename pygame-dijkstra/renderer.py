@@ -0,0 +1,300 @@
+"""
+Layered, incremental grid renderer for the pygame visualizer.
+
+GridRenderer draws a GridGraph and the state of a search into a rectangle of
+the screen from three layers:
+    - a background surface with the grid lines and the outer border, built once
+    - a wall layer holding walls and terrain, updated per edited cell and
+      rebuilt in one vectorized pass when most of the grid changed
+      (maze generation, clear, load)
+    - the search state (visited, frontier, path, heat map, start and end),
+      drawn per cell on top
+The caller reports which cells changed (edits and search step deltas), so a
+frame only looks at those cells and composes again the ones whose look
+changed; their rects are returned for pygame.display.update(). Nothing
+proportional to the size of the search is diffed or copied per frame.
+"""
+import numpy as np
+import pygame
+
+from grid_graph import MIN_COST, MAX_COST
+
+# Color palette: black walls, off-white background
+COLOR_BG = (245, 245, 245)         # Off-white background
+COLOR_GRID = (0, 0, 0)             # Black grid lines (outer border)
+COLOR_INNER_GRID = (200, 200, 200) # Light gray for inner grid lines
+COLOR_WALL = (0, 0, 0)             # Black for walls
+COLOR_PATH = (128, 0, 255)         # Purple for final path
+COLOR_VISITED = (255, 128, 192)    # Pink for visited (initial path)
+COLOR_FRONTIER = (0, 168, 0)       # Green for frontier
+COLOR_TERRAIN_LOW = (235, 222, 196)  # Light sand for cost 2
+COLOR_TERRAIN_HIGH = (130, 90, 50)   # Dark brown for the maximum cost
+COLOR_HEAT_NEAR = (255, 240, 120)  # Light yellow close to the start
+COLOR_HEAT_FAR = (220, 40, 40)     # Red for the farthest wavefront
+
+# Width of the outer border, drawn above the walls
+BORDER = 2
+# Above this many edited cells the wall layer is rebuilt instead of patched
+REBUILD_CELLS = 256
+
+def blend(lo, hi, t):
+    return tuple(round(a + (b - a) * t) for a, b in zip(lo, hi))
+
+def terrain_color(cost):
+    return blend(COLOR_TERRAIN_LOW, COLOR_TERRAIN_HIGH, (cost - MIN_COST - 1) / max(1, MAX_COST - MIN_COST - 1))
+
+# RGBA of the wall layer per terrain cost (transparent for the base cost)
+TERRAIN_RGBA = np.zeros((MAX_COST + 1, 4), dtype=np.uint8)
+for _cost in range(MIN_COST + 1, MAX_COST + 1):
+    TERRAIN_RGBA[_cost] = terrain_color(_cost) + (255,)
+
+class GridRenderer:
+    """
+    Draws one grid into a screen rectangle, redrawing only what changed.
+    The caller reports changes as they happen: edit() for walls and terrain,
+    mark_step() / mark() / mark_path() for the search state, and mark_all()
+    or rebuild() when the state or the grid is replaced wholesale. A frame
+    then costs time in proportion to the cells that changed, not to the
+    cells searched.
+    Params:
+        screen (pygame.Surface): Target surface.
+        origin (tuple): Top-left pixel of the grid on screen.
+        rows (int): Number of rows in the grid.
+        cols (int): Number of columns in the grid.
+        cell_size (int): Cell side in pixels.
+        start_icon (pygame.Surface): Icon of the start cell (cell_size - 4 square).
+        end_icon (pygame.Surface): Icon of the end cell.
+    """
+
+    def __init__(self, screen, origin, rows, cols, cell_size, start_icon, end_icon):
+        self.screen = screen
+        self.rows = rows
+        self.cols = cols
+        self.cell_size = cell_size
+        self.rect = pygame.Rect(origin[0], origin[1], cols * cell_size, rows * cell_size)
+        self.start_icon = start_icon
+        self.end_icon = end_icon
+        self.background = self._build_background()
+        self.wall_layer = None
+        # Cells composed by the last draw(), for the frame-time overlay
+        self.drawn_cells = 0
+        self.invalidate()
+
+    def cell_at(self, pos):
+        """Cell under a screen position, or None outside the grid."""
+        if not self.rect.collidepoint(pos):
+            return None
+        return ((pos[1] - self.rect.y) // self.cell_size, (pos[0] - self.rect.x) // self.cell_size)
+
+    def invalidate(self):
+        """Forget everything drawn; the next draw() repaints the whole grid."""
+        self._full = True
+        self._walls_stale = True
+        self._looks = {}
+        self._dirty = set()
+        self._edited = set()
+        self._path = set()
+        self._path_stale = True
+        self._state_stale = False
+        self._heat_scale = 0
+        self._ends = ()
+
+    # Changes
+
+    def edit(self, cells):
+        """Walls or terrain costs of cells changed."""
+        self._edited.update(cells)
+
+    def rebuild(self):
+        """The whole grid changed (maze generated, cleared or loaded)."""
+        self._walls_stale = True
+        self._full = True
+
+    def mark(self, cells):
+        """The search state of cells changed."""
+        self._dirty.update(cells)
+
+    def mark_step(self, step):
+        """Mark the cells of a delta event from algorithms.apply_step."""
+        dirty = self._dirty
+        if step["settled"] is not None:
+            dirty.add(step["settled"])
+        dirty.update(step["pushed"])
+        dirty.update(step["removed"])
+        dirty.update(step.get("wavefront", ()))
+
+    def mark_path(self):
+        """The path changed; its old and new cells are redrawn."""
+        self._path_stale = True
+
+    def mark_all(self):
+        """The search state was replaced (cleared, reloaded from the cache, repaired)."""
+        self._state_stale = True
+        self._path_stale = True
+
+    # Layers
+
+    def _build_background(self):
+        size = self.cell_size
+        surface = pygame.Surface(self.rect.size).convert()
+        surface.fill(COLOR_BG)
+        width, height = self.rect.size
+        for row in range(1, self.rows):
+            pygame.draw.line(surface, COLOR_INNER_GRID, (0, row * size), (width - 1, row * size), width=1)
+        for col in range(1, self.cols):
+            pygame.draw.line(surface, COLOR_INNER_GRID, (col * size, 0), (col * size, height - 1), width=1)
+        pygame.draw.rect(surface, COLOR_GRID, surface.get_rect(), width=BORDER)
+        return surface
+
+    def _rebuild_wall_layer(self, walls, costs):
+        # One RGBA pixel per cell, scaled up to the cell size with NumPy
+        rgba = TERRAIN_RGBA[costs]
+        rgba[walls != 0] = COLOR_WALL + (255,)
+        pixels = np.repeat(np.repeat(rgba, self.cell_size, axis=0), self.cell_size, axis=1)
+        self.wall_layer = pygame.image.frombuffer(pixels.tobytes(), self.rect.size, "RGBA").convert_alpha()
+        self._clear_border_ring()
+
+    def _patch_wall_layer(self, cells, walls, costs):
+        size = self.cell_size
+        layer = self.wall_layer
+        for row, col in cells:
+            rect = (col * size, row * size, size, size)
+            layer.fill((0, 0, 0, 0), rect)
+            if walls[row, col]:
+                layer.fill(COLOR_WALL, rect)
+            elif costs[row, col] > MIN_COST:
+                layer.fill(terrain_color(int(costs[row, col])), rect)
+        self._clear_border_ring()
+
+    def _clear_border_ring(self):
+        # Keep the outer border of the background visible above edge walls
+        width, height = self.rect.size
+        for strip in ((0, 0, width, BORDER), (0, height - BORDER, width, BORDER),
+                      (0, 0, BORDER, height), (width - BORDER, 0, BORDER, height)):
+            self.wall_layer.fill((0, 0, 0, 0), strip)
+
+    # Cells
+
+    def _look(self, cell, wall, start, end, visited, frontier, heat):
+        """(content, content color) of a cell, or None for an empty cell."""
+        if cell == start:
+            return "start", None
+        if cell == end:
+            return "end", None
+        if wall:
+            return None
+        if cell in self._path:
+            return "path", COLOR_PATH
+        if cell in visited:
+            if cell in heat:
+                return "heat", blend(COLOR_HEAT_NEAR, COLOR_HEAT_FAR, heat[cell] / max(1, self._heat_scale))
+            return "visited", COLOR_VISITED
+        if cell in frontier:
+            return "frontier", COLOR_FRONTIER
+        return None
+
+    def _draw_content(self, x, y, look):
+        content, color = look
+        inner = (x + 2, y + 2, self.cell_size - 4, self.cell_size - 4)
+        if content == "start":
+            self.screen.blit(self.start_icon, inner[:2])
+        elif content == "end":
+            self.screen.blit(self.end_icon, inner[:2])
+        else:
+            pygame.draw.rect(self.screen, color, inner, border_radius=6)
+
+    def _draw_cell(self, row, col, look):
+        size = self.cell_size
+        local = pygame.Rect(col * size, row * size, size, size)
+        rect = local.move(self.rect.topleft)
+        self.screen.blit(self.background, rect, local)
+        self.screen.blit(self.wall_layer, rect, local)
+        if look is not None:
+            self._draw_content(rect.x, rect.y, look)
+        return rect
+
+    def draw(self, grid, start, end, path, visited, frontier, heat=None, heat_max=0, live=False):
+        """
+        Bring the screen up to date and return the dirty rects.
+        Params:
+            grid (GridGraph): Walls and terrain costs.
+            start, end (tuple): Start and end cells.
+            path (list): Cells of the found path (read only after mark_path()).
+            visited, frontier (set): Search state.
+            heat (dict): BFS level per cell for the distance-field heat map.
+            heat_max (int): Level of the farthest wavefront.
+            live (bool): A search is still adding wavefronts. Heat colors are
+                relative to heat_max; while live they are rescaled only when
+                heat_max outgrows the current scale by a quarter, so a frame
+                does not recolor every reached cell.
+        """
+        heat = heat if heat is not None else {}
+        walls, costs = grid.cells, grid.cost_cells
+        candidates = self._dirty
+        self._dirty = set()
+        if self._state_stale:
+            # Everything drawn before and everything in the new state
+            self._state_stale = False
+            candidates.update(self._looks)
+            candidates |= visited
+            candidates |= frontier
+
+        if self._path_stale:
+            new_path = set(path)
+            candidates |= new_path ^ self._path
+            self._path = new_path
+            self._path_stale = False
+        scale = self._heat_scale
+        if not live:
+            scale = heat_max
+        elif heat_max > scale:
+            scale = max(heat_max, scale + scale // 4)
+        if scale != self._heat_scale:
+            # Heat colors are relative to the scale
+            self._heat_scale = scale
+            candidates.update(heat)
+
+        if self._walls_stale or len(self._edited) > REBUILD_CELLS:
+            self._rebuild_wall_layer(walls, costs)
+            self._walls_stale = False
+            self._full = True
+        elif self._edited:
+            self._patch_wall_layer(self._edited, walls, costs)
+        # Edited cells are composed again even when their content is unchanged
+        edited = self._edited
+        candidates |= edited
+        self._edited = set()
+        candidates.update(self._ends)
+        candidates.update((start, end))
+        self._ends = (start, end)
+
+        looks = self._looks
+        if self._full:
+            # The layers already show empty cells and walls; only content is drawn
+            self._full = False
+            self.screen.blit(self.background, self.rect)
+            self.screen.blit(self.wall_layer, self.rect)
+            looks.clear()
+            candidates |= visited
+            candidates |= frontier
+            candidates |= self._path
+            size = self.cell_size
+            for row, col in candidates:
+                look = self._look((row, col), walls[row, col], start, end, visited, frontier, heat)
+                if look is not None:
+                    looks[row, col] = look
+                    self._draw_content(self.rect.x + col * size, self.rect.y + row * size, look)
+            self.drawn_cells = len(candidates)
+            return [self.rect]
+
+        rects = []
+        for row, col in candidates:
+            look = self._look((row, col), walls[row, col], start, end, visited, frontier, heat)
+            if look != looks.get((row, col)) or (row, col) in edited:
+                if look is None:
+                    looks.pop((row, col), None)
+                else:
+                    looks[row, col] = look
+                rects.append(self._draw_cell(row, col, look))
+        self.drawn_cells = len(rects)
+        return rects
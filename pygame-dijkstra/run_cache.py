@@ -0,0 +1,76 @@
+"""
+Caching of finished search runs for the visualizer.
+
+ZobristHash keeps a 64-bit hash of a GridGraph's walls and terrain that is
+updated in O(1) per changed cell, and RunCache is a bounded LRU of finished
+runs keyed by (grid hash, start, end, algorithm).
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+from grid_graph import MAX_COST, WALL
+
+class ZobristHash:
+    """
+    Zobrist hash of a grid: the XOR of one random 64-bit key per wall cell and
+    one key per (cell, terrain cost). Toggling a wall or changing a cost XORs
+    the affected keys in or out, so the hash never needs a full rescan.
+    Params:
+        rows (int): Number of rows in the grid.
+        cols (int): Number of columns in the grid.
+        seed (int): Seed for the random keys.
+    """
+
+    def __init__(self, rows, cols, seed=0):
+        rng = np.random.default_rng(seed)
+        high = np.iinfo(np.uint64).max
+        self.wall_keys = rng.integers(0, high, size=(rows, cols), dtype=np.uint64, endpoint=True)
+        self.cost_keys = rng.integers(0, high, size=(MAX_COST + 1, rows, cols), dtype=np.uint64, endpoint=True)
+        self.value = 0
+
+    def rehash(self, graph):
+        """Recompute the hash from scratch, e.g. after maze generation or clearing."""
+        walls = np.bitwise_xor.reduce(self.wall_keys[graph.cells == WALL])
+        rows, cols = np.indices(graph.cost_cells.shape)
+        costs = np.bitwise_xor.reduce(self.cost_keys[graph.cost_cells, rows, cols], axis=None)
+        self.value = int(walls) ^ int(costs)
+        return self.value
+
+    def toggle_wall(self, cell):
+        self.value ^= int(self.wall_keys[cell[0], cell[1]])
+
+    def change_cost(self, cell, old, new):
+        r, c = cell
+        self.value ^= int(self.cost_keys[old, r, c]) ^ int(self.cost_keys[new, r, c])
+
+class RunCache:
+    """
+    Bounded LRU cache of finished runs with hit and miss counters.
+    Params:
+        maxsize (int): Number of runs kept before the least recently used is evicted.
+    """
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._runs = OrderedDict()
+
+    def __len__(self):
+        return len(self._runs)
+
+    def get(self, key):
+        run = self._runs.get(key)
+        if run is None:
+            self.misses += 1
+            return None
+        self._runs.move_to_end(key)
+        self.hits += 1
+        return run
+
+    def put(self, key, run):
+        self._runs[key] = run
+        self._runs.move_to_end(key)
+        while len(self._runs) > self.maxsize:
+            self._runs.popitem(last=False)
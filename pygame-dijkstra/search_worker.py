@@ -0,0 +1,155 @@
+"""
+Run a stepwise search in a worker process and stream its events back.
+
+The search generator is created in the UI process (so errors such as JPS on
+weighted terrain are raised there) and advanced in a forked child, which
+sends its delta events through a bounded queue in batches. Cells travel as
+flat ints (row * cols + col) and delta events as (settled, pushed, removed)
+tuples; SearchWorker decodes them back into the event dicts apply_step folds.
+The final event is sent as it is, minus anything that cannot leave the
+worker (LPA*'s "planner").
+
+The child is forked so it starts from the grid as it is when the run starts
+and never has to re-import the pygame application; WORKER_AVAILABLE is False
+on platforms without fork.
+"""
+from collections import deque
+import multiprocessing
+import queue
+import time
+
+# Events per message and messages the queue holds; the worker blocks when the
+# UI falls this far behind
+BATCH_EVENTS = 256
+MAX_BATCHES = 64
+# A batch is also sent once it is this old (seconds), so slow searches stream
+BATCH_SECONDS = 0.004
+# How often a blocked worker checks for cancellation (seconds)
+POLL_INTERVAL = 0.05
+
+WORKER_AVAILABLE = "fork" in multiprocessing.get_all_start_methods()
+
+def _flat(cells, cols):
+    return [r * cols + c for r, c in cells]
+
+def _cells(flats, cols):
+    return [divmod(i, cols) for i in flats]
+
+def _encode(step, cols):
+    settled = step["settled"]
+    event = (-1 if settled is None else settled[0] * cols + settled[1],
+             _flat(step["pushed"], cols), _flat(step["removed"], cols))
+    if "wavefront" in step:
+        event += (step["level"], _flat(step["wavefront"], cols))
+    return event
+
+def _decode(event, cols):
+    settled = None if event[0] < 0 else divmod(event[0], cols)
+    step = {"current": settled, "settled": settled,
+            "pushed": _cells(event[1], cols), "removed": _cells(event[2], cols)}
+    if len(event) > 3:
+        step["level"] = event[3]
+        step["wavefront"] = _cells(event[4], cols)
+    return step
+
+def _put(out, cancel, message):
+    # False when the run was cancelled while the queue was full
+    while not cancel.is_set():
+        try:
+            out.put(message, timeout=POLL_INTERVAL)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+def _run(steps, cols, out, cancel):
+    batch = []
+    sent = time.perf_counter()
+    try:
+        for step in steps:
+            if cancel.is_set():
+                break
+            if "path" in step:
+                final = {key: value for key, value in step.items() if key != "planner"}
+                if (batch and not _put(out, cancel, ("steps", batch))) or not _put(out, cancel, ("done", final)):
+                    break
+                return
+            batch.append(_encode(step, cols))
+            if len(batch) == BATCH_EVENTS or time.perf_counter() - sent >= BATCH_SECONDS:
+                if not _put(out, cancel, ("steps", batch)):
+                    break
+                batch = []
+                sent = time.perf_counter()
+        else:
+            if not batch or _put(out, cancel, ("steps", batch)):
+                _put(out, cancel, ("end", None))
+            return
+    except Exception as exc:
+        _put(out, cancel, ("error", f"{type(exc).__name__}: {exc}"))
+        return
+    # Cancelled: exit without waiting for the UI to read what is still queued
+    out.cancel_join_thread()
+
+class SearchWorker:
+    """
+    A search running in a worker process, read like a generator of step
+    events. next() returns the next event, None when the worker has not sent
+    one yet, and raises StopIteration once the search is over; an exception
+    in the worker is raised as RuntimeError.
+    Params:
+        steps (iterator): A search from algorithms.STEPWISE, not started yet.
+        cols (int): Number of grid columns, used to pack cells as flat ints.
+    """
+
+    def __init__(self, steps, cols):
+        context = multiprocessing.get_context("fork")
+        self.cols = cols
+        self.queue = context.Queue(MAX_BATCHES)
+        self.cancel_event = context.Event()
+        self.pending = deque()
+        self.done = False
+        self.process = context.Process(target=_run, args=(steps, cols, self.queue, self.cancel_event), daemon=True)
+        self.process.start()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.pending:
+            if self.done:
+                raise StopIteration
+            try:
+                kind, payload = self.queue.get_nowait()
+            except queue.Empty:
+                if not self.process.is_alive() and self.queue.empty():
+                    # Killed without reporting back
+                    self.done = True
+                    raise StopIteration
+                return None
+            if kind == "steps":
+                self.pending.extend(payload)
+            elif kind == "done":
+                self.done = True
+                self.process.join()
+                return payload
+            elif kind == "end":
+                self.done = True
+                self.process.join()
+                raise StopIteration
+            else:
+                self.done = True
+                raise RuntimeError(payload)
+        return _decode(self.pending.popleft(), self.cols)
+
+    def cancel(self):
+        """Stop the worker and drop whatever it has not delivered."""
+        self.done = True
+        self.pending.clear()
+        if self.process.is_alive():
+            self.cancel_event.set()
+            self.process.join(timeout=0.2)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+        self.queue.close()
+        self.queue.cancel_join_thread()
@@ -0,0 +1,125 @@
+"""
+Headless solver: load a maze file once and answer one or more path queries.
+
+Usage:
+    python solve.py MAZE [--algorithm astar] [--pair R0 C0 R1 C1 ...]
+                         [--pairs FILE] [--no-path] [--indent N]
+
+MAZE is a text, .npy or packed .maze file (see maze_io.py); large files are memory-mapped.
+Each --pair gives start and end coordinates; --pairs reads more from a file
+("-" for stdin) with one "R0 C0 R1 C1" line per query and '#' comments.
+Without any pair the maze is solved from the top-left to the bottom-right
+corner. The grid is loaded once and every query reuses it (HPA* also reuses
+its abstract graph).
+
+The result is printed as JSON: the maze size, load time and one entry per
+query with the path, cost, cells expanded, the solver's search counters and
+its runtime.
+"""
+import argparse
+import json
+import sys
+import time
+
+from algorithms import SOLVERS
+from hpa import HPAStar
+from maze_io import load_maze
+
+ALGORITHMS = list(SOLVERS) + ["hpa"]
+
+def read_pairs(path):
+    """Parse "R0 C0 R1 C1" lines from a file or stdin ("-") into ((r0, c0), (r1, c1)) pairs."""
+    f = sys.stdin if path == "-" else open(path)
+    try:
+        pairs = []
+        for number, line in enumerate(f, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            values = line.replace(",", " ").split()
+            if len(values) != 4:
+                raise ValueError(f"{path}:{number}: expected R0 C0 R1 C1, got {line!r}")
+            r0, c0, r1, c1 = map(int, values)
+            pairs.append(((r0, c0), (r1, c1)))
+        return pairs
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def solve_pairs(graph, algorithm, pairs, with_path=True):
+    """
+    Run algorithm on graph for every (start, end) pair.
+    Params:
+        graph (GridGraph): Loaded maze, shared by every query.
+        algorithm (str): A key of algorithms.SOLVERS, or "hpa".
+        pairs (list of tuple): (start, end) cells to connect.
+        with_path (bool): Include the path cells in each result.
+    """
+    if algorithm == "hpa":
+        solve = HPAStar(graph).query
+    else:
+        solver = SOLVERS[algorithm]
+        def solve(start, end):
+            return solver(start, end, graph.rows, graph.cols, graph)
+    results = []
+    for start, end in pairs:
+        result = solve(start, end)
+        entry = {"start": list(start), "end": list(end)}
+        entry.update(result)
+        entry["time_ms"] = round(entry.pop("algo_ns") / 1e6, 4)
+        entry["path_length"] = len(result["path"])
+        if with_path:
+            entry["path"] = [list(cell) for cell in result["path"]]
+        else:
+            del entry["path"]
+        results.append(entry)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve path queries on a maze file and print JSON.")
+    parser.add_argument("maze", help="text, .npy or .maze file")
+    parser.add_argument("--algorithm", "-a", default="astar", choices=ALGORITHMS)
+    parser.add_argument("--pair", type=int, nargs=4, action="append", default=[],
+                        metavar=("R0", "C0", "R1", "C1"), help="start and end cell; may be repeated")
+    parser.add_argument("--pairs", help='file of "R0 C0 R1 C1" lines, or - for stdin')
+    parser.add_argument("--no-path", action="store_true", help="omit the path cells from the output")
+    parser.add_argument("--indent", type=int, default=None, help="indent the JSON output")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    try:
+        graph = load_maze(args.maze)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    load_ms = (time.perf_counter() - t0) * 1000
+
+    pairs = [((r0, c0), (r1, c1)) for r0, c0, r1, c1 in args.pair]
+    if args.pairs:
+        try:
+            pairs += read_pairs(args.pairs)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+    if not pairs:
+        pairs = [((0, 0), (graph.rows - 1, graph.cols - 1))]
+    for start, end in pairs:
+        for r, c in (start, end):
+            if not (0 <= r < graph.rows and 0 <= c < graph.cols):
+                parser.error(f"cell ({r}, {c}) is outside the {graph.rows}x{graph.cols} maze")
+
+    try:
+        results = solve_pairs(graph, args.algorithm, pairs, with_path=not args.no_path)
+    except ValueError as e:
+        # e.g. JPS on a maze with terrain costs
+        parser.error(str(e))
+    json.dump({
+        "maze": args.maze,
+        "rows": graph.rows,
+        "cols": graph.cols,
+        "algorithm": args.algorithm,
+        "load_ms": round(load_ms, 3),
+        "results": results,
+    }, sys.stdout, indent=args.indent)
+    sys.stdout.write("\n")
+
+if __name__ == "__main__":
+    main()